@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк парсера на фікстурах (без bezsvitla.com.ua)
+Піднімає replay_server у фоновому потоці і проганяє fetch_queues + save_results у тимчасовій папці:
+- cold - без HTTP кешу (усі 24 сторінки качаються і парсяться)
+- warm - з кешем попереднього прогону (304 → слоти з кешу)
+Для кожного сценарію - медіана часу з --repeat прогонів, кількість запитів до сервера
+і пік пам'яті (tracemalloc, окремим прогоном, щоб не впливати на час).
+Окремо - час parse_html_schedule на сторінку для кожного бекенду.
+
+    python scripts/bench_parser.py --repeat 5 --json bench-parser.json
+    python scripts/bench_parser.py --compare bench-parser.json --tolerance 0.25   # exit 1 при регресії
+
+За замовчуванням rate limit вимкнено (--rate 1000), а затримка сервера фіксована,
+щоб час показував роботу парсера, а не паузи між запитами.
+"""
+import io
+import os
+import sys
+import json
+import time
+import tempfile
+import argparse
+import statistics
+import tracemalloc
+from contextlib import redirect_stdout
+
+import parser as gpv_parser
+from http_cache import ResponseCache
+from html_extract import EXTRACTORS, iter_fixture_pages
+from replay_server import start_server, DEFAULT_ROOT
+
+SCENARIOS = ('cold', 'warm')
+# Метрики, де більше - гірше (для --compare)
+GATED_METRICS = ('seconds', 'peak_kb', 'requests')
+
+def run_once(server, workdir, cached, args):
+    """Один прогін парсера → (секунди, запитів до сервера)"""
+    cache = ResponseCache(os.path.join(workdir, 'http.json')) if cached else None
+    session = gpv_parser.create_session(args.workers)
+    server.reset_stats()
+    with redirect_stdout(io.StringIO()):
+        started = time.perf_counter()
+        qdata = gpv_parser.fetch_queues(session, workers=args.workers, rate=args.rate, burst=args.rate,
+                                        cache=cache, backend=args.extractor, site=server.url)
+        gpv_parser.save_results(qdata, archive_path=None, output_path=os.path.join(workdir, 'gpv.json'))
+        seconds = time.perf_counter() - started
+    session.close()
+    return seconds, server.stats['requests']
+
+def measured_run(server, scenario, args, trace=False):
+    """Прогін у тимчасовій папці (warm - після підготовчого прогону) → (секунди, запити, пік байт)"""
+    warm = scenario == 'warm'
+    with tempfile.TemporaryDirectory(prefix='bench-parser-') as workdir:
+        if warm:
+            run_once(server, workdir, True, args)
+        if trace:
+            tracemalloc.start()
+        seconds, requests = run_once(server, workdir, warm, args)
+        peak = None
+        if trace:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+    return seconds, requests, peak
+
+def bench_scenario(server, scenario, args):
+    """Медіана часу, запити і пік пам'яті для сценарію"""
+    runs = [measured_run(server, scenario, args) for _ in range(args.repeat)]
+    times = [seconds for seconds, _, _ in runs]
+    _, _, peak = measured_run(server, scenario, args, trace=True)
+    return {
+        'seconds': round(statistics.median(times), 4),
+        'min_seconds': round(min(times), 4),
+        'requests': runs[-1][1],
+        'peak_kb': round(peak / 1024, 1),
+    }
+
+def bench_parse(root, repeat):
+    """Мс на сторінку parse_html_schedule для кожного бекенду (медіана по сторінках)"""
+    pages = [p.read_text(encoding='utf-8') for p in iter_fixture_pages(root)]
+    result = {}
+    for backend in EXTRACTORS:
+        per_page = []
+        for page in pages:
+            started = time.perf_counter()
+            for _ in range(repeat):
+                gpv_parser.parse_html_schedule(page, backend)
+            per_page.append((time.perf_counter() - started) / repeat * 1000)
+        result[backend] = {
+            'ms_per_page': round(statistics.median(per_page), 3),
+            'max_ms': round(max(per_page), 3),
+            'pages': len(pages),
+        }
+    return result
+
+def compare(results, baseline, tolerance):
+    """Список регресій відносно baseline (метрика гірша більше ніж на tolerance)"""
+    regressions = []
+    for scenario in SCENARIOS:
+        for metric in GATED_METRICS:
+            old = baseline.get('scenarios', {}).get(scenario, {}).get(metric)
+            new = results['scenarios'][scenario][metric]
+            if old and new > old * (1 + tolerance):
+                regressions.append(f"{scenario}.{metric}: {old} → {new}")
+    for backend, stats in results['parse'].items():
+        old = baseline.get('parse', {}).get(backend, {}).get('ms_per_page')
+        if old and stats['ms_per_page'] > old * (1 + tolerance):
+            regressions.append(f"parse.{backend}: {old} → {stats['ms_per_page']} ms/page")
+    return regressions
+
+if __name__ == '__main__':
+    p = argparse.ArgumentParser()
+    p.add_argument('--fixtures', default=DEFAULT_ROOT)
+    p.add_argument('--repeat', type=int, default=5)
+    p.add_argument('--workers', type=int, default=gpv_parser.DEFAULT_WORKERS)
+    p.add_argument('--rate', type=float, default=1000.0, help='запитів/сек (rate limit парсера)')
+    p.add_argument('--latency', type=float, default=0.02, help='сек затримки replay_server на запит')
+    p.add_argument('--error-rate', type=float, default=0.0)
+    p.add_argument('--throttle-rate', type=float, default=0.0)
+    p.add_argument('--extractor', choices=sorted(EXTRACTORS), default=gpv_parser.DEFAULT_BACKEND)
+    p.add_argument('--json', default=None, help='зберегти результати у файл')
+    p.add_argument('--compare', default=None, help='baseline JSON попереднього запуску')
+    p.add_argument('--tolerance', type=float, default=0.25, help='допустиме погіршення (0.25 = 25%%)')
+    args = p.parse_args()
+    if not iter_fixture_pages(args.fixtures):
+        print(f"ERROR: no fixtures in {args.fixtures}")
+        sys.exit(1)
+
+    server = start_server(args.fixtures, latency=args.latency, error_rate=args.error_rate,
+                          throttle_rate=args.throttle_rate, retry_after=0)
+    try:
+        results = {
+            'config': {k: getattr(args, k) for k in ('repeat', 'workers', 'rate', 'latency',
+                                                     'error_rate', 'throttle_rate', 'extractor')},
+            'scenarios': {name: bench_scenario(server, name, args) for name in SCENARIOS},
+            'parse': bench_parse(args.fixtures, args.repeat),
+        }
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    for name, stats in results['scenarios'].items():
+        print(f"[BENCH] {name}: {stats['seconds']:.3f}s (min {stats['min_seconds']:.3f}s), "
+              f"requests={stats['requests']}, peak={stats['peak_kb']:.0f} KB")
+    for backend, stats in results['parse'].items():
+        print(f"[PARSE] {backend}: {stats['ms_per_page']:.3f} ms/page (max {stats['max_ms']:.3f}, "
+              f"{stats['pages']} pages)")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"[OK] {args.json}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for r in regressions:
+            print(f"[REGRESSION] {r}")
+        print(f"\n[STATS] Regressions: {len(regressions)} (tolerance {args.tolerance:.0%})")
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк рендеру PNG на GPV JSON (без запису в images/)
+Сценарії (усі черги + дві таблиці на сьогодні/завтра, мс на зображення - медіана з --repeat прогонів):
+- mpl       - matplotlib (малювання і кодування PNG разом - savefig)
+- raster    - NumPy + Pillow, статичний шар малюється щоразу
+- template  - NumPy + Pillow, статичний шар з кешу шаблонів (копія + змінні клітинки і підписи)
+- palette   - як template, але PNG з індексованою палітрою (png_encode, --png-mode palette) + WebP поруч
+mpl, raster і template кодують RGB PNG (--png-mode rgb) - база для порівняння розміру і часу кодування.
+Для raster/template/palette окремо: draw (до RGB масиву) і encode (PNG), плюс разова побудова шаблонів (cold).
+
+    python scripts/bench_render.py --repeat 5 --json bench-render.json
+    python scripts/bench_render.py --compare bench-render.json --tolerance 0.25   # exit 1 при регресії
+"""
+import io
+import sys
+import json
+import time
+import tempfile
+import argparse
+import statistics
+
+from render_common import RenderData, get_backend
+from png_encode import use_png_mode, encode_webp
+
+SCENARIOS = ('mpl', 'raster', 'template', 'palette')
+# Метрики, де більше - гірше (для --compare)
+GATED_METRICS = ('ms', 'draw_ms', 'kb')
+
+def jobs(data):
+    """(назва, функція малювання, аргументи) для кожного зображення"""
+    return ([(gkey, 'queue', (data, gkey)) for gkey in data.gpv_keys(data.today_ts)] +
+            [(f'all-{day}', 'overview', (data, ts, data.gpv_keys(ts)))
+             for day, ts in (('today', data.today_ts), ('tomorrow', data.tomorrow_ts)) if data.gpv_keys(ts)])
+
+def time_mpl(data, repeat):
+    """мс на зображення: Figure → savefig у пам'ять"""
+    mpl = get_backend('mpl')
+    draw = {'queue': mpl.draw_queue_figure, 'overview': mpl.draw_overview_figure}
+    times, sizes = [], []
+    for _ in range(repeat):
+        for _, kind, args in jobs(data):
+            out = io.BytesIO()
+            started = time.perf_counter()
+            mpl.save_figure(draw[kind](*args), out)
+            times.append((time.perf_counter() - started) * 1000)
+            sizes.append(out.tell())
+    return {'ms': round(statistics.median(times), 2), 'draw_ms': None, 'encode_ms': None,
+            'kb': round(statistics.median(sizes) / 1024, 1)}
+
+def time_raster(data, repeat, webp=False):
+    """
+    мс на зображення: draw (RGB масив) + encode (PNG у пам'ять) з поточними налаштуваннями шаблонів і режиму PNG;
+    webp - ще й WebP з готового PNG (webp_ms, webp_kb)
+    """
+    raster = get_backend('raster')
+    draw = {'queue': raster.draw_queue_image, 'overview': raster.draw_overview_image}
+    draws, encodes, sizes, webp_times, webp_sizes = [], [], [], [], []
+    for _ in range(repeat):
+        for _, kind, args in jobs(data):
+            out = io.BytesIO()
+            started = time.perf_counter()
+            buf = draw[kind](*args)
+            drawn = time.perf_counter()
+            raster.save_image(buf, out)
+            draws.append((drawn - started) * 1000)
+            encodes.append((time.perf_counter() - drawn) * 1000)
+            sizes.append(out.tell())
+            if webp:
+                started = time.perf_counter()
+                webp_sizes.append(len(encode_webp(out.getvalue())))
+                webp_times.append((time.perf_counter() - started) * 1000)
+    results = {'ms': round(statistics.median(d + e for d, e in zip(draws, encodes)), 2),
+               'draw_ms': round(statistics.median(draws), 3), 'encode_ms': round(statistics.median(encodes), 2),
+               'kb': round(statistics.median(sizes) / 1024, 1)}
+    if webp:
+        results['webp_ms'] = round(statistics.median(webp_times), 2)
+        results['webp_kb'] = round(statistics.median(webp_sizes) / 1024, 1)
+    return results
+
+def bench(data, repeat):
+    raster = get_backend('raster')
+    use_png_mode('rgb')
+    results = {'mpl': time_mpl(data, repeat)}
+    raster.use_templates(None)
+    results['raster'] = time_raster(data, repeat)
+    with tempfile.TemporaryDirectory(prefix='bench-render-') as tmp:
+        templates = raster.use_templates(tmp)
+        started = time.perf_counter()
+        time_raster(data, 1)
+        cold_ms = (time.perf_counter() - started) * 1000
+        results['template'] = time_raster(data, repeat)
+        results['template']['cold_total_ms'] = round(cold_ms, 1)
+        results['template']['templates'] = dict(templates.stats)
+        use_png_mode('palette')
+        results['palette'] = time_raster(data, repeat, webp=True)
+    raster.use_templates()
+    use_png_mode()
+    return results
+
+def compare(results, baseline, tolerance):
+    """Список регресій відносно baseline (метрика гірша більше ніж на tolerance)"""
+    regressions = []
+    for scenario in SCENARIOS:
+        for metric in GATED_METRICS:
+            old = baseline.get('scenarios', {}).get(scenario, {}).get(metric)
+            new = results['scenarios'][scenario][metric]
+            if old and new and new > old * (1 + tolerance):
+                regressions.append(f"{scenario}.{metric}: {old} → {new}")
+    return regressions
+
+if __name__ == '__main__':
+    p = argparse.ArgumentParser()
+    p.add_argument('--data', default='data/Vinnytsiaoblenerho.json', help='GPV JSON (повний або компактний)')
+    p.add_argument('--repeat', type=int, default=3)
+    p.add_argument('--json', default=None, help='зберегти результати у файл')
+    p.add_argument('--compare', default=None, help='baseline JSON попереднього запуску')
+    p.add_argument('--tolerance', type=float, default=0.25, help='допустиме погіршення (0.25 = 25%%)')
+    args = p.parse_args()
+
+    data = RenderData.load(args.data)
+    results = {
+        'config': {'data': args.data, 'repeat': args.repeat, 'images': len(jobs(data))},
+        'scenarios': bench(data, args.repeat),
+    }
+
+    base = results['scenarios']['mpl']['ms']
+    for name, stats in results['scenarios'].items():
+        parts = f"draw {stats['draw_ms']:.2f} ms + encode {stats['encode_ms']:.1f} ms, " if stats['draw_ms'] else ''
+        print(f"[BENCH] {name}: {stats['ms']:.1f} ms/image ({parts}{stats['kb']:.0f} KB, "
+              f"x{base / stats['ms']:.1f} vs mpl)")
+    palette, template = results['scenarios']['palette'], results['scenarios']['template']
+    print(f"[BENCH] palette vs template (rgb): encode {template['encode_ms']:.1f} → {palette['encode_ms']:.1f} ms, "
+          f"{template['kb']:.0f} → {palette['kb']:.0f} KB (x{template['kb'] / palette['kb']:.1f} smaller); "
+          f"webp +{palette['webp_ms']:.1f} ms, {palette['webp_kb']:.0f} KB")
+    print(f"[BENCH] template cold run: {template['cold_total_ms']:.0f} ms for {results['config']['images']} images, "
+          f"templates {template['templates']}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"[OK] {args.json}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for r in regressions:
+            print(f"[REGRESSION] {r}")
+        print(f"\n[STATS] Regressions: {len(regressions)} (tolerance {args.tolerance:.0%})")
+        sys.exit(1 if regressions else 0)
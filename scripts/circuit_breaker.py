@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Circuit breaker для URL bezsvitla, що пам'ятає збої між запусками
+- FAIL_THRESHOLD збоїв поспіль → URL "відкритий": не качається OPEN_SECONDS
+- після паузи - одна пробна спроба (half-open): успіх закриває, збій відкриває знову на вдвічі довше
+  (не більше MAX_OPEN_SECONDS)
+Стан: cache/<регіон>-breaker.json (regions.region_paths)
+"""
+import json
+import os
+import time
+
+from regions import get_region, region_paths
+
+FAIL_THRESHOLD = 2
+OPEN_SECONDS = 1800
+MAX_OPEN_SECONDS = 6 * 3600
+# той самий файл, що й у parser.py для регіону за замовчуванням
+BREAKER_PATH = region_paths(get_region())['breaker']
+
+class CircuitOpenError(Exception):
+    """URL пропущено, бо breaker відкритий"""
+
+class CircuitBreaker:
+    """Стан: {url: {failures, open_until, open_seconds, last_error}}"""
+
+    def __init__(self, path=BREAKER_PATH):
+        self.path = path
+        self.state = {}
+        self.load()
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.state = json.load(f)
+        except Exception as e:
+            print(f"[WARN] Could not read circuit breaker state {self.path}: {e}")
+
+    def save(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.path)
+
+    def allow(self, url, now=None):
+        """False - URL відкритий і пауза ще не минула"""
+        entry = self.state.get(url)
+        if not entry or not entry.get('open_until'):
+            return True
+        return (now or time.time()) >= entry['open_until']
+
+    def record_success(self, url):
+        self.state.pop(url, None)
+
+    def record_failure(self, url, error, now=None):
+        now = now or time.time()
+        entry = self.state.setdefault(url, {'failures': 0, 'open_until': None, 'open_seconds': 0})
+        entry['failures'] += 1
+        entry['last_error'] = str(error)[:200]
+        if entry['failures'] >= FAIL_THRESHOLD:
+            # half-open спроба не вдалася - пауза вдвічі довша
+            entry['open_seconds'] = min(MAX_OPEN_SECONDS, max(OPEN_SECONDS, entry['open_seconds'] * 2))
+            entry['open_until'] = int(now + entry['open_seconds'])
+
+    def open_urls(self, now=None):
+        now = now or time.time()
+        return [u for u in self.state if not self.allow(u, now)]
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Історичний архів розкладів (SQLite, тільки дописування)
+Кожен новий contentHash → рядок у snapshots; у queue_days потрапляють тільки ті черги-дні,
+маска яких змінилася відносно попереднього запису (48-бітна маска як у gpv_compact, NULL - даних немає).
+Розклад черги на день "як було відомо на момент T" - останній рядок queue_days з observed_at <= T
+(індекс (gpv, day, observed_at)).
+
+    python scripts/gpv_archive.py record data/Vinnytsiaoblenerho.json
+    python scripts/gpv_archive.py query --gpv GPV3.1 --date 2025-12-07 --at "2025-12-07 10:00"
+    python scripts/gpv_archive.py history --gpv GPV3.1 --date 2025-12-07
+    python scripts/gpv_archive.py --region <id> history ...   (архів іншого регіону з scripts/regions.py)
+"""
+import json
+import os
+import sys
+import sqlite3
+import argparse
+from datetime import datetime, timezone, timedelta
+
+from gpv_compact import encode_slots, decode_slots
+from regions import REGIONS, DEFAULT_REGION, get_region, region_paths
+
+# той самий файл, що й у parser.py для регіону за замовчуванням (інший регіон - --region у CLI)
+ARCHIVE_PATH = region_paths(get_region())['archive']
+KYIV_TZ = timezone(timedelta(hours=2))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY,
+    content_hash TEXT NOT NULL,
+    observed_at INTEGER NOT NULL,
+    today INTEGER
+);
+CREATE INDEX IF NOT EXISTS snapshots_hash ON snapshots(content_hash);
+CREATE INDEX IF NOT EXISTS snapshots_observed ON snapshots(observed_at);
+CREATE TABLE IF NOT EXISTS queue_days (
+    snapshot_id INTEGER NOT NULL REFERENCES snapshots(id),
+    gpv TEXT NOT NULL,
+    day INTEGER NOT NULL,
+    observed_at INTEGER NOT NULL,
+    mask INTEGER
+);
+CREATE INDEX IF NOT EXISTS queue_days_lookup ON queue_days(gpv, day, observed_at);
+"""
+
+def day_timestamp(date_str):
+    """YYYY-MM-DD → timestamp початку дня за Києвом (як fact.today)"""
+    d = datetime.strptime(date_str, '%Y-%m-%d').replace(tzinfo=KYIV_TZ)
+    return int(d.timestamp())
+
+def parse_moment(value):
+    """'YYYY-MM-DD HH:MM' (Київ) або unix timestamp → timestamp"""
+    if value is None:
+        return None
+    if str(value).isdigit():
+        return int(value)
+    return int(datetime.strptime(value, '%Y-%m-%d %H:%M').replace(tzinfo=KYIV_TZ).timestamp())
+
+class ScheduleArchive:
+    """Append-only архів GPV документів"""
+
+    def __init__(self, path=ARCHIVE_PATH):
+        self.path = path
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def latest_hash(self):
+        row = self.db.execute("SELECT content_hash FROM snapshots ORDER BY id DESC LIMIT 1").fetchone()
+        return row[0] if row else None
+
+    def _latest_mask(self, gpv, day):
+        row = self.db.execute(
+            "SELECT mask FROM queue_days WHERE gpv = ? AND day = ? ORDER BY observed_at DESC, rowid DESC LIMIT 1",
+            (gpv, day)).fetchone()
+        return row
+
+    def record(self, doc):
+        """Записує документ, якщо його contentHash відрізняється від останнього. True - якщо записано"""
+        content_hash = doc.get('meta', {}).get('contentHash')
+        if not content_hash or content_hash == self.latest_hash():
+            return False
+        observed_at = int(doc.get('lastUpdated') or datetime.now(KYIV_TZ).timestamp())
+        with self.db:
+            cur = self.db.execute(
+                "INSERT INTO snapshots (content_hash, observed_at, today) VALUES (?, ?, ?)",
+                (content_hash, observed_at, doc.get('fact', {}).get('today')))
+            snapshot_id = cur.lastrowid
+            for day, queues in doc.get('fact', {}).get('data', {}).items():
+                for gpv, slots in queues.items():
+                    mask = encode_slots(slots)
+                    prev = self._latest_mask(gpv, int(day))
+                    if prev is not None and prev[0] == mask:
+                        continue
+                    self.db.execute(
+                        "INSERT INTO queue_days (snapshot_id, gpv, day, observed_at, mask) VALUES (?, ?, ?, ?, ?)",
+                        (snapshot_id, gpv, int(day), observed_at, mask))
+        return True
+
+    def schedule_at(self, gpv, day, at=None):
+        """
+        Слоти черги на день, як вони були відомі на момент at (None - останні відомі).
+        None - якщо на той момент про цей день ще нічого не було відомо.
+        """
+        if at is None:
+            at = 2 ** 62
+        row = self.db.execute(
+            "SELECT mask, observed_at FROM queue_days WHERE gpv = ? AND day = ? AND observed_at <= ? "
+            "ORDER BY observed_at DESC, rowid DESC LIMIT 1",
+            (gpv, int(day), int(at))).fetchone()
+        if row is None:
+            return None
+        return {'observed_at': row[1], 'slots': decode_slots(row[0])}
+
+    def history(self, gpv, day):
+        """Усі версії розкладу черги на день: [(observed_at, slots), ...]"""
+        rows = self.db.execute(
+            "SELECT observed_at, mask FROM queue_days WHERE gpv = ? AND day = ? ORDER BY observed_at, rowid",
+            (gpv, int(day))).fetchall()
+        return [(at, decode_slots(mask)) for at, mask in rows]
+
+def format_slots(slots):
+    """Короткий вигляд для консолі: 24 символи . (yes) # (no) < (first) > (second)"""
+    if not slots:
+        return '(немає даних)'
+    marks = {'yes': '.', 'no': '#', 'first': '<', 'second': '>'}
+    return ''.join(marks.get(slots.get(str(i), 'yes'), '?') for i in range(1, 25))
+
+def format_moment(ts):
+    return datetime.fromtimestamp(ts, tz=KYIV_TZ).strftime('%d.%m.%Y %H:%M')
+
+if __name__ == '__main__':
+    p = argparse.ArgumentParser()
+    p.add_argument('--region', choices=sorted(REGIONS), default=DEFAULT_REGION,
+                   help='регіон з scripts/regions.py (архів - як у parser.py)')
+    p.add_argument('--archive', default=None, help='файл архіву (замість шляху регіону)')
+    sub = p.add_subparsers(dest='command', required=True)
+    rec = sub.add_parser('record', help='записати GPV JSON в архів')
+    rec.add_argument('json')
+    for name in ('query', 'history'):
+        q = sub.add_parser(name)
+        q.add_argument('--gpv', required=True)
+        q.add_argument('--date', required=True, help='YYYY-MM-DD')
+        if name == 'query':
+            q.add_argument('--at', default=None, help="'YYYY-MM-DD HH:MM' (Київ) або unix timestamp")
+            q.add_argument('--json-output', action='store_true')
+    args = p.parse_args()
+
+    archive = ScheduleArchive(args.archive or region_paths(get_region(args.region))['archive'])
+    try:
+        if args.command == 'record':
+            with open(args.json, 'r', encoding='utf-8') as f:
+                recorded = archive.record(json.load(f))
+            print("[OK] recorded" if recorded else "[SKIP] same contentHash")
+        elif args.command == 'query':
+            found = archive.schedule_at(args.gpv, day_timestamp(args.date), parse_moment(args.at))
+            if found is None:
+                print(f"ERROR: nothing known about {args.gpv} on {args.date}", file=sys.stderr)
+                sys.exit(1)
+            if args.json_output:
+                print(json.dumps(found, ensure_ascii=False))
+            else:
+                print(f"{args.gpv} {args.date} (відомо з {format_moment(found['observed_at'])})")
+                print(format_slots(found['slots']))
+        else:
+            for at, slots in archive.history(args.gpv, day_timestamp(args.date)):
+                print(f"{format_moment(at)}  {format_slots(slots)}")
+    finally:
+        archive.close()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Компактний формат GPV: одна черга-день = 48-бітна маска півгодин без світла
+Біт i = півгодина i (0 → 00:00-00:30, 47 → 23:30-24:00), 1 = світла нема.
+Черга-день без даних (сторінка недоступна, {} у GPV JSON) кодується як null.
+
+data/Vinnytsiaoblenerho.compact.json:
+{
+  "format": "gpv-mask48/1",
+  "regionId": "vinnytsia",
+  "regionAffiliation": "Вінницька область",
+  "today": 1765058400,
+  "update": "07.12.2025 10:56",
+  "contentHash": "<той самий, що й meta.contentHash у повному файлі>",
+  "days": {"1765058400": {"GPV1.1": 16777215, ...}, ...}
+}
+
+Розгорнути назад у GPV JSON:
+    python scripts/gpv_compact.py data/Vinnytsiaoblenerho.compact.json
+"""
+import json
+import os
+import sys
+import hashlib
+import argparse
+
+from slot_mask import HALF_HOURS, slots_to_codes, codes_to_mask, mask_to_codes, codes_to_slots
+
+COMPACT_FORMAT = "gpv-mask48/1"
+
+def compact_path(json_path):
+    """data/X.json → data/X.compact.json"""
+    root, ext = os.path.splitext(str(json_path))
+    return f"{root}.compact{ext or '.json'}"
+
+def mask_to_int(mask):
+    """bool маска 48 → ціле (біт i = півгодина i)"""
+    return sum(1 << i for i, off in enumerate(mask) if off)
+
+def int_to_mask(value):
+    """ціле → bool маска 48"""
+    return [bool(value >> i & 1) for i in range(HALF_HOURS)]
+
+def encode_slots(slots):
+    """{"1": "yes", ...} → ціле; {} → None"""
+    if not slots:
+        return None
+    return mask_to_int(codes_to_mask(slots_to_codes(slots)))
+
+def decode_slots(value):
+    """ціле → {"1": "yes", ...}; None → {}"""
+    if value is None:
+        return {}
+    return codes_to_slots(mask_to_codes(int_to_mask(value)))
+
+def encode_data(fact_data):
+    """fact.data (результат transform_to_gpv) → {day: {gpv: ціле}}"""
+    return {day: {gpv: encode_slots(slots) for gpv, slots in queues.items()}
+            for day, queues in fact_data.items()}
+
+def decode_data(days):
+    """{day: {gpv: ціле}} → fact.data"""
+    return {day: {gpv: decode_slots(value) for gpv, value in queues.items()}
+            for day, queues in days.items()}
+
+def content_hash(fact_data):
+    """SHA256 як у meta.contentHash повного файлу"""
+    return hashlib.sha256(json.dumps(fact_data, sort_keys=True).encode()).hexdigest()
+
+def encode_document(result):
+    """Повний GPV документ → компактний"""
+    fact = result.get('fact', {})
+    return {
+        "format": COMPACT_FORMAT,
+        "regionId": result.get('regionId'),
+        "regionAffiliation": result.get('regionAffiliation'),
+        "today": fact.get('today'),
+        "update": fact.get('update'),
+        "contentHash": result.get('meta', {}).get('contentHash') or content_hash(fact.get('data', {})),
+        "days": encode_data(fact.get('data', {})),
+    }
+
+def decode_document(compact):
+    """Компактний документ → GPV документ з тими полями, які читають рендерери"""
+    data = decode_data(compact.get('days', {}))
+    gpv_keys = sorted({gpv for queues in data.values() for gpv in queues})
+    return {
+        "regionId": compact.get('regionId'),
+        "regionAffiliation": compact.get('regionAffiliation'),
+        "fact": {
+            "data": data,
+            "update": compact.get('update', ''),
+            "today": compact.get('today'),
+        },
+        "preset": {
+            "sch_names": {k: f"Черга {k[3:]}" for k in gpv_keys},
+        },
+        "meta": {
+            "contentHash": compact.get('contentHash'),
+        },
+    }
+
+def save_compact(path, result):
+    """Записує компактний файл поруч з повним (атомарно)"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(encode_document(result), f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp, path)
+
+def load_gpv(path):
+    """Читає GPV JSON у повному або компактному форматі (повертає повний)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        doc = json.load(f)
+    if doc.get('format') == COMPACT_FORMAT:
+        return decode_document(doc)
+    return doc
+
+if __name__ == '__main__':
+    p = argparse.ArgumentParser()
+    p.add_argument('compact', help='файл *.compact.json')
+    p.add_argument('--out', default=None, help='куди записати повний JSON (за замовчуванням stdout)')
+    args = p.parse_args()
+
+    doc = load_gpv(args.compact)
+    if content_hash(doc['fact']['data']) != doc['meta'].get('contentHash'):
+        print("ERROR: contentHash mismatch", file=sys.stderr)
+        sys.exit(1)
+    text = json.dumps(doc, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        print(text)
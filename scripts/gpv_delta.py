@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Дельти GPV JSON між запусками парсера
+Кожна зміна - [day, gpv_key, slot, old, new]; old/new = null, якщо черги-дня не було
+(новий день, зниклий день, черга без даних).
+
+data/Vinnytsiaoblenerho.delta.json   - дельта останнього запуску
+data/Vinnytsiaoblenerho.deltas.jsonl - журнал дельт (тільки запуски зі зміною contentHash)
+
+Сумарна дельта від відомого споживачу contentHash до поточного стану:
+    python scripts/gpv_delta.py --since <contentHash>
+"""
+import json
+import os
+import sys
+import argparse
+
+SLOT_KEYS = [str(i) for i in range(1, 25)]
+MAX_LOG_ENTRIES = 1000
+
+def delta_paths(json_path):
+    """data/X.json → (data/X.delta.json, data/X.deltas.jsonl)"""
+    root, _ = os.path.splitext(str(json_path))
+    return f"{root}.delta.json", f"{root}.deltas.jsonl"
+
+def diff_data(old_data, new_data):
+    """Порівнює fact.data двох документів → список [day, gpv, slot, old, new]"""
+    changes = []
+    days = sorted(set(old_data) | set(new_data), key=int)
+    for day in days:
+        old_queues = old_data.get(day, {})
+        new_queues = new_data.get(day, {})
+        for gpv in sorted(set(old_queues) | set(new_queues)):
+            old_slots = old_queues.get(gpv) or {}
+            new_slots = new_queues.get(gpv) or {}
+            if old_slots == new_slots:
+                continue
+            for slot in SLOT_KEYS:
+                old, new = old_slots.get(slot), new_slots.get(slot)
+                if old != new:
+                    changes.append([int(day), gpv, int(slot), old, new])
+    return changes
+
+def make_delta(prev_doc, doc):
+    """Дельта між попереднім і новим GPV документом"""
+    prev_doc = prev_doc or {}
+    return {
+        "from": prev_doc.get('meta', {}).get('contentHash'),
+        "to": doc.get('meta', {}).get('contentHash'),
+        "at": doc.get('lastUpdated'),
+        "changes": diff_data(prev_doc.get('fact', {}).get('data', {}),
+                             doc.get('fact', {}).get('data', {})),
+    }
+
+def compose(deltas):
+    """Послідовні дельти → одна сумарна (скасовані зміни відкидаються)"""
+    merged = {}
+    for delta in deltas:
+        for day, gpv, slot, old, new in delta['changes']:
+            key = (day, gpv, slot)
+            if key in merged:
+                merged[key][1] = new
+            else:
+                merged[key] = [old, new]
+    return [[day, gpv, slot, old, new]
+            for (day, gpv, slot), (old, new) in merged.items() if old != new]
+
+def load_log(log_path):
+    if not os.path.exists(log_path):
+        return []
+    with open(log_path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def append_log(log_path, delta):
+    """Дописує дельту в журнал (зберігаються останні MAX_LOG_ENTRIES)"""
+    entries = load_log(log_path)
+    entries.append(delta)
+    if len(entries) > MAX_LOG_ENTRIES:
+        entries = entries[-MAX_LOG_ENTRIES:]
+        tmp = f"{log_path}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            for entry in entries:
+                f.write(json.dumps(entry, ensure_ascii=False, separators=(',', ':')) + '\n')
+        os.replace(tmp, log_path)
+    else:
+        with open(log_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(delta, ensure_ascii=False, separators=(',', ':')) + '\n')
+
+def save_delta(json_path, prev_doc, doc):
+    """Пише дельту запуску; у журнал - тільки якщо contentHash змінився"""
+    delta = make_delta(prev_doc, doc)
+    delta_path, log_path = delta_paths(json_path)
+    tmp = f"{delta_path}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(delta, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp, delta_path)
+    if delta['from'] != delta['to']:
+        append_log(log_path, delta)
+    return delta
+
+def delta_since(log_path, since_hash):
+    """
+    Сумарна дельта від since_hash до останнього стану журналу.
+    None - якщо такого стану в журналі немає (споживачу треба перечитати весь файл).
+    """
+    entries = load_log(log_path)
+    if not entries:
+        return None
+    current = entries[-1]['to']
+    if since_hash == current:
+        start = len(entries)
+    else:
+        start = next((i + 1 for i in range(len(entries) - 1, -1, -1) if entries[i]['to'] == since_hash), None)
+        if start is None and entries[0]['from'] == since_hash:
+            start = 0
+        if start is None:
+            return None
+    return {"from": since_hash, "to": current, "changes": compose(entries[start:])}
+
+if __name__ == '__main__':
+    p = argparse.ArgumentParser()
+    p.add_argument('--json', default='data/Vinnytsiaoblenerho.json', help='повний GPV JSON')
+    p.add_argument('--since', required=True, help='contentHash, відомий споживачу')
+    args = p.parse_args()
+
+    _, log_path = delta_paths(args.json)
+    result = delta_since(log_path, args.since)
+    if result is None:
+        print(f"ERROR: contentHash {args.since} not found in {log_path}", file=sys.stderr)
+        sys.exit(1)
+    print(json.dumps(result, ensure_ascii=False))
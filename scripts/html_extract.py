@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Витяг інтервалів з HTML сторінок bezsvitla
+Бекенди:
+- lxml - libxml2 парсер + заздалегідь скомпільовані XPath (швидкий, за замовчуванням)
+- bs4  - BeautifulSoup(html.parser) + CSS select (fallback)
+Кожен бекенд повертає список (текст часу, is_off) для елементів `div.card-body ul li`,
+у яких є <span> і іконка .icon-off/.icon-on.
+
+Порівняння бекендів на фікстурах:
+    python scripts/html_extract.py fixtures/bezsvitla
+"""
+import sys
+import time
+import argparse
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+try:
+    from lxml import etree, html as lxml_html
+except ImportError:
+    lxml_html = None
+
+def extract_bs4(html):
+    """Повний BeautifulSoup розбір (поведінка до появи бекендів)"""
+    soup = BeautifulSoup(html, 'html.parser')
+    items = []
+    for li in soup.select('div.card-body ul li'):
+        ts = li.find('span')
+        icon = li.select_one('.icon-off, .icon-on')
+        if not ts or not icon:
+            continue
+        items.append((ts.get_text(strip=True), bool(li.select_one('.icon-off'))))
+    return items
+
+def _has_class(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+if lxml_html is not None:
+    _LI_XPATH = etree.XPath(f"//div[{_has_class('card-body')}]//ul//li")
+    _SPAN_XPATH = etree.XPath("(.//span)[1]")
+    _ICON_XPATH = etree.XPath(f"boolean(.//*[{_has_class('icon-off')} or {_has_class('icon-on')}])")
+    _OFF_XPATH = etree.XPath(f"boolean(.//*[{_has_class('icon-off')}])")
+
+def extract_lxml(html):
+    """lxml + скомпільовані XPath, ті самі селектори що й у bs4"""
+    root = lxml_html.fromstring(html)
+    items = []
+    for li in _LI_XPATH(root):
+        spans = _SPAN_XPATH(li)
+        if not spans or not _ICON_XPATH(li):
+            continue
+        text = ''.join(t.strip() for t in spans[0].itertext())
+        items.append((text, _OFF_XPATH(li)))
+    return items
+
+EXTRACTORS = {'bs4': extract_bs4}
+if lxml_html is not None:
+    EXTRACTORS['lxml'] = extract_lxml
+
+DEFAULT_BACKEND = 'lxml' if 'lxml' in EXTRACTORS else 'bs4'
+FIXTURES_ROOT = Path(__file__).resolve().parent.parent / 'fixtures' / 'bezsvitla'
+
+def extract_items(html, backend=None):
+    """Витягує (текст часу, is_off); якщо швидкий бекенд не впорався - fallback на bs4"""
+    backend = backend or DEFAULT_BACKEND
+    if backend == 'bs4':
+        return extract_bs4(html)
+    try:
+        return EXTRACTORS[backend](html)
+    except Exception as e:
+        print(f"[WARN] {backend} extractor failed ({e}), falling back to bs4")
+        return extract_bs4(html)
+
+def iter_fixture_pages(root):
+    """Усі *.html у папці фікстур (рекурсивно, у стабільному порядку)"""
+    return sorted(Path(root).rglob('*.html'))
+
+def compare_backends(root, repeat=5):
+    """
+    Порівнює бекенди на фікстурах: однаковість витягнутих інтервалів
+    (а отже і слотів parse_html_schedule) та середній час на сторінку
+    """
+    pages = [(p, p.read_text(encoding='utf-8')) for p in iter_fixture_pages(root)]
+    if not pages:
+        print(f"ERROR: no fixtures in {root}")
+        return False
+
+    ok = True
+    for path, page in pages:
+        results = {b: extract(page) for b, extract in EXTRACTORS.items()}
+        if any(r != results['bs4'] for r in results.values()):
+            ok = False
+            print(f"[DIFF] {path}")
+
+    for backend, extract in EXTRACTORS.items():
+        started = time.perf_counter()
+        for _ in range(repeat):
+            for _, page in pages:
+                extract(page)
+        ms = (time.perf_counter() - started) / (repeat * len(pages)) * 1000
+        print(f"[TIME] {backend}: {ms:.2f} ms/page")
+
+    print(f"\n[STATS] Pages: {len(pages)}, Backends: {', '.join(EXTRACTORS)}, Identical: {ok}")
+    return ok
+
+if __name__ == '__main__':
+    p = argparse.ArgumentParser()
+    p.add_argument('fixtures', nargs='?', default=str(FIXTURES_ROOT))
+    p.add_argument('--repeat', type=int, default=5)
+    args = p.parse_args()
+
+    sys.exit(0 if compare_backends(args.fixtures, args.repeat) else 1)
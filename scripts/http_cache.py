@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+HTTP кеш сторінок bezsvitla (conditional GET)
+Зберігає на диску для кожного URL: ETag / Last-Modified, SHA256 тіла і вже розпарсені слоти.
+Якщо сервер відповів 304 або тіло не змінилося - слоти беруться з кешу без парсингу HTML.
+"""
+import json
+import os
+import hashlib
+import time
+
+# Змінюється разом з логікою parse_html_schedule - старі слоти тоді відкидаються
+CACHE_VERSION = 2
+
+def body_hash(content):
+    """SHA256 тіла відповіді (bytes)"""
+    return hashlib.sha256(content).hexdigest()
+
+class ResponseCache:
+    """Кеш відповідей за URL: {url: {etag, last_modified, body_hash, slots, at}}"""
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self.hits = 0
+        self.not_modified = 0
+        self.misses = 0
+        self.skipped = 0
+        self.load()
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                raw = json.load(f)
+        except Exception as e:
+            print(f"[WARN] Could not read HTTP cache {self.path}: {e}")
+            return
+        if raw.get('version') == CACHE_VERSION:
+            self.entries = raw.get('entries', {})
+
+    def save(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'version': CACHE_VERSION, 'entries': self.entries}, f, ensure_ascii=False)
+        os.replace(tmp, self.path)
+
+    def conditional_headers(self, url):
+        """If-None-Match / If-Modified-Since для URL (порожньо, якщо кешу немає)"""
+        entry = self.entries.get(url)
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def cached_slots(self, url):
+        """Останні слоти URL без запиту (None - кешу немає)"""
+        entry = self.entries.get(url)
+        return dict(entry['slots']) if entry else None
+
+    def slots_for(self, url, response, parse):
+        """
+        Повертає слоти сторінки: з кешу (304 або те саме тіло) або parse(html) з оновленням кешу.
+        Для помилкових відповідей - {} як і раніше.
+        """
+        entry = self.entries.get(url)
+        if response.status_code == 304 and entry:
+            self.hits += 1
+            self.not_modified += 1
+            entry['at'] = int(time.time())
+            return dict(entry['slots'])
+        if not response.ok or response.status_code == 304:
+            return {}
+
+        digest = body_hash(response.content)
+        if entry and entry.get('body_hash') == digest:
+            self.hits += 1
+            slots = entry['slots']
+        else:
+            self.misses += 1
+            slots = parse(response.text)
+
+        self.entries[url] = {
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'body_hash': digest,
+            'slots': slots,
+            'at': int(time.time()),
+        }
+        return dict(slots)
+
+    def reset_stats(self):
+        self.hits = self.not_modified = self.misses = self.skipped = 0
+
+    def summary(self):
+        return f"hits={self.hits} (304: {self.not_modified}), misses={self.misses}, not fetched={self.skipped}"
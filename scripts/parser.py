@@ -2,56 +2,116 @@
 """
 🔌 GPV VOE Вінниця - BezSvitla Parser
 Парсить 12 черг → data/Vinnytsiaoblenerho.json (GPV формат з first/second)
+Інші регіони - --region (scripts/regions.py), кілька регіонів паралельно - scripts/run_regions.py
 """
 import json
 import os
 import time
 import sys
 import re
+import argparse
+import random
+import signal
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime, timezone, timedelta
 import hashlib
-from bs4 import BeautifulSoup
 import requests
 from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+from http_cache import ResponseCache
+from html_extract import extract_items, EXTRACTORS, DEFAULT_BACKEND
+from slot_mask import intervals_to_slots
+from gpv_compact import compact_path, save_compact
+from schedule_model import Schedule, QueueDay
+from gpv_delta import save_delta
+from gpv_archive import ScheduleArchive
+from poll_planner import PollPlanner
+from circuit_breaker import CircuitBreaker, CircuitOpenError
+from regions import REGIONS, DEFAULT_REGION, get_region, region_paths, queue_urls, gpv_key
 
 def log(msg):
     print(msg)
     sys.stdout.flush()
 
-for lib in ['requests', 'bs4']:
+for lib in ['requests', 'bs4', 'numpy']:
     try:
         __import__(lib)
     except ImportError:
         print(f"❌ ERROR: pip install -r requirements.txt")
         sys.exit(1)
 
-QUEUE_MAPPING = {
-    "1.1": "1.1",
-    "1.2": "1.2",
-    "2.1": "2.1",
-    "2.2": "2.2",
-    "3.1": "3.1",
-    "3.2": "3.2",
-    "4.1": "4.1",
-    "4.2": "4.2",
-    "5.1": "5.1",
-    "5.2": "5.2",
-    "6.1": "6.1",
-    "6.2": "6.2"
-}
-
-QUEUE_TO_GPV = {k: f"GPV{k}" for k in QUEUE_MAPPING}
-ALL_QUEUE_KEYS = list(QUEUE_MAPPING)
-BASE_URL = "https://bezsvitla.com.ua/vinnytska-oblast/cherha-{queue}"
-TOMORROW_URL = BASE_URL + "/grafik-na-zavtra"
+# Регіон за замовчуванням (--region); решта - у scripts/regions.py
+REGION = get_region(DEFAULT_REGION)
+PATHS = region_paths(REGION)
+ALL_QUEUE_KEYS = REGION['queues']
+QUEUE_TO_GPV = {k: gpv_key(k) for k in ALL_QUEUE_KEYS}
 KYIV_TZ = timezone(timedelta(hours=2))
 
-def create_session():
+# Паралельне завантаження: 24 сторінки (сьогодні + завтра для 12 черг)
+DEFAULT_WORKERS = 4       # одночасних запитів
+DEFAULT_RATE = 4.0        # запитів/сек (замість time.sleep(1.5) між чергами)
+DEFAULT_BURST = 4         # скільки запитів можна зробити без очікування
+DEFAULT_DEADLINE = 120.0  # сек на весь прогін
+DEFAULT_QUEUE_BUDGET = 30.0  # сек на обидві сторінки черги (з повторами)
+REQUEST_TIMEOUT = 30
+RETRIES = 3               # повтори на 429/5xx/мережеву помилку, поки вкладаються в бюджет
+RETRY_BACKOFF = 1.0       # 1, 2, 4 с між повторами
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+OUTPUT_PATH = PATHS['output']
+ARCHIVE_PATH = PATHS['archive']
+# Поля, зміна яких означає новий вміст документа (решта - час перевірки і статус - іде в heartbeat)
+PUBLISH_KEYS = [('meta', 'contentHash'), ('meta', 'schemaVersion'), ('fact', 'today'), ('preset', 'sch_names')]
+
+# Режим демона (--daemon)
+DEFAULT_INTERVAL = 600.0  # сек між запусками
+DEFAULT_JITTER = 30.0     # ± сек випадкового зсуву
+STATUS_DURATIONS = 20     # скільки останніх тривалостей циклу зберігати
+
+class TokenBucket:
+    """Token bucket: не більше rate запитів/сек, з запасом burst"""
+
+    def __init__(self, rate, burst=1):
+        self.rate = float(rate)
+        self.capacity = max(1.0, float(burst))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, deadline=None):
+        """Чекає на токен. False - якщо токен не встигне з'явитися до deadline"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                wait_s = (1 - self.tokens) / self.rate
+            if deadline is not None and now + wait_s > deadline:
+                return False
+            time.sleep(wait_s)
+
+class QueueBudget:
+    """Бюджет часу на чергу: відлік від першого запиту черги, але не пізніше дедлайну прогону"""
+
+    def __init__(self, seconds, run_deadline):
+        self.seconds = float(seconds)
+        self.run_deadline = run_deadline
+        self.started = {}
+        self.lock = threading.Lock()
+
+    def deadline(self, group):
+        with self.lock:
+            started = self.started.setdefault(group, time.monotonic())
+        return min(self.run_deadline, started + self.seconds)
+
+def create_session(pool_size=DEFAULT_WORKERS):
+    """Сесія без повторів на рівні urllib3 - повтори робить fetch_url у межах бюджету"""
     s = requests.Session()
-    retry_strategy = Retry(total=3, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504])
-    s.mount('http://', HTTPAdapter(max_retries=retry_strategy))
-    s.mount('https://', HTTPAdapter(max_retries=retry_strategy))
+    adapter = HTTPAdapter(max_retries=0, pool_maxsize=max(pool_size, 10))
+    s.mount('http://', adapter)
+    s.mount('https://', adapter)
     s.headers.update({
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
         'Accept': 'text/html,application/xhtml+xml,*/*;q=0.9',
@@ -63,117 +123,328 @@ def parse_time_slot(t):
     m = re.match(r'(\d{2}):(\d{2})\s*[––\-\s–]\s*(\d{2}):(\d{2})', t)
     return tuple(map(int, m.groups())) if m else None
 
-def round_minutes_to_half_hour(minutes):
-    """< 30 → 0, >= 30 → 30"""
-    return 30 if minutes >= 30 else 0
-
-def hour_to_slot(h):
-    """Слот N = (N-1):00 до N:00"""
-    return 1 if h == 0 else h + 1
-
-def parse_html_schedule(html):
+def parse_html_schedule(html, backend=None):
     """
     Парсить HTML і повертає слоти 1-24 зі станами:
     - "yes" - світло є
     - "no" - повна година без світла
     - "first" - перші 30 хв без світла
     - "second" - другі 30 хв без світла
+    backend - бекенд витягу з html_extract (lxml / bs4)
+    Всі інтервали без світла об'єднуються на півгодинній масці (slot_mask)
     """
-    soup = BeautifulSoup(html, 'html.parser')
-    slots = {str(i): "yes" for i in range(1, 25)}
-    li_el = soup.select('div.card-body ul li')
+    intervals = []
+    for text, is_off in extract_items(html, backend):
+        t = parse_time_slot(text)
+        if t and is_off:
+            intervals.append(t)
+    return intervals_to_slots(intervals)
 
-    for li in li_el:
-        ts = li.find('span')
-        icon = li.select_one('.icon-off, .icon-on')
-        if not ts or not icon:
-            continue
+def get_queue_urls(q, site=None, region=REGION):
+    """URL сторінок сьогодні / завтра (site - заміна адреси сайту регіону)"""
+    return queue_urls(region, q, site)
 
-        t = parse_time_slot(ts.get_text(strip=True))
-        if not t:
-            continue
+def retry_delay(response, attempt):
+    """Пауза перед повтором: Retry-After (секунди) або експоненційний backoff"""
+    retry_after = response.headers.get('Retry-After') if response is not None else None
+    if retry_after and retry_after.strip().isdigit():
+        return float(retry_after)
+    return RETRY_BACKOFF * 2 ** attempt
 
-        start_hour, start_minute, end_hour, end_minute = t
-        is_off = bool(li.select_one('.icon-off'))
-        if not is_off:
-            continue
+def fetch_url(s, url, bucket, deadline, cache=None):
+    """
+    GET з урахуванням rate limit і дедлайну (conditional, якщо є кеш).
+    Повтори на 429/5xx/мережеву помилку - тільки поки пауза і запит вкладаються в deadline.
+    """
+    headers = cache.conditional_headers(url) if cache else None
+    response, error = None, None
+    for attempt in range(RETRIES + 1):
+        if not bucket.acquire(deadline):
+            error = error or TimeoutError("deadline exceeded (rate limit)")
+            break
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            error = error or TimeoutError("deadline exceeded")
+            break
+        try:
+            response, error = s.get(url, timeout=min(REQUEST_TIMEOUT, remaining), headers=headers), None
+        except requests.RequestException as e:
+            response, error = None, e
+        if response is not None and response.status_code not in RETRY_STATUSES:
+            return response
+        if attempt == RETRIES:
+            break
+        delay = retry_delay(response, attempt)
+        if time.monotonic() + delay >= deadline:
+            break
+        time.sleep(delay)
+    if response is not None:
+        return response
+    raise error
 
-        # Стартовий слот
-        start_slot = hour_to_slot(start_hour)
-
-        # Обробка кінця з округленням
-        rounded_end_minute = round_minutes_to_half_hour(end_minute)
-        if rounded_end_minute == 30:
-            actual_end_hour = end_hour + 1
-        else:
-            actual_end_hour = end_hour
-        end_slot = hour_to_slot(actual_end_hour)
-
-        # Заповнюємо всі слоти як "no"
-        for slot in range(start_slot, end_slot):
-            if 1 <= slot <= 24:
-                slots[str(slot)] = "no"
-
-        # Коригуємо перший слот якщо старт не з 00 хв
-        if start_minute != 0 and start_slot <= 24:
-            if start_minute >= 30:
-                slots[str(start_slot)] = "second"
+def fetch_all(s, urls, workers=DEFAULT_WORKERS, bucket=None, deadline=None, cache=None,
+              groups=None, group_budget=None):
+    """
+    Завантажує всі URL пулом з workers потоків.
+    groups ({url: черга}) + group_budget (сек) - окремий бюджет часу на кожну групу URL.
+    Повертає {url: response або Exception}; що не встигло до deadline - TimeoutError.
+    """
+    if bucket is None:
+        bucket = TokenBucket(DEFAULT_RATE, DEFAULT_BURST)
+    if deadline is None:
+        deadline = time.monotonic() + DEFAULT_DEADLINE
+    budget = QueueBudget(group_budget, deadline) if groups and group_budget else None
+
+    def task(url):
+        return fetch_url(s, url, bucket, budget.deadline(groups[url]) if budget else deadline, cache)
+
+    results = {}
+    pool = ThreadPoolExecutor(max_workers=workers)
+    futures = {pool.submit(task, u): u for u in urls}
+    done, pending = wait(futures, timeout=max(0.0, deadline - time.monotonic()))
+    for f in done:
+        try:
+            results[futures[f]] = f.result()
+        except Exception as e:
+            results[futures[f]] = e
+    for f in pending:
+        results[futures[f]] = TimeoutError("run deadline exceeded")
+    pool.shutdown(wait=False, cancel_futures=True)
+    return results
+
+def page_failed(response):
+    """
+    Збій сайту (мережа, 429, 5xx) - для circuit breaker. Інші 4xx (напр. 404 до публікації розкладу
+    на завтра) - "немає даних", як і раніше ({}), breaker не відкривають
+    """
+    if isinstance(response, Exception):
+        return True
+    return response is not None and (response.status_code == 429 or response.status_code >= 500)
+
+def page_slots(url, response, cache=None, backend=None):
+    """
+    Слоти сторінки: через кеш (304 / те саме тіло / не качали за планом) або парсинг HTML.
+    Недоступна сторінка - виняток (parse_queue підставить None).
+    """
+    parse = lambda html: parse_html_schedule(html, backend)
+    if response is None:
+        cache.skipped += 1
+        return cache.cached_slots(url)
+    if isinstance(response, Exception):
+        raise response
+    if page_failed(response):
+        raise requests.HTTPError(f"HTTP {response.status_code}")
+    if cache:
+        return cache.slots_for(url, response, parse)
+    return parse(response.text) if response.ok else {}
+
+def parse_queue(q, i, responses, cache=None, backend=None, site=None, region=REGION):
+    """Збирає слоти черги з уже завантажених сторінок (None замість слотів недоступної сторінки)"""
+    result = {'queue_key': q}
+    timings, errors = [], []
+    for field, url in zip(('today_slots', 'tomorrow_slots'), get_queue_urls(q, site, region)):
+        t0 = time.perf_counter()
+        try:
+            result[field] = page_slots(url, responses[url], cache, backend)
+        except Exception as e:
+            result[field] = None
+            errors.append(f"{field.split('_')[0]}: {e}")
+        timings.append((time.perf_counter() - t0) * 1000)
+    total = len(region['queues'])
+    if errors:
+        log(f"[{i:2d}/{total}] {q} ERROR: {'; '.join(errors)}")
+    else:
+        log(f"[{i:2d}/{total}] {q} (parse: {timings[0]:.1f} + {timings[1]:.1f} ms)")
+    return result
+
+def queue_complete(q):
+    return bool(q) and q['today_slots'] is not None and q['tomorrow_slots'] is not None
+
+def fetch_queues(s, queues=None, workers=DEFAULT_WORKERS,
+                 rate=DEFAULT_RATE, burst=DEFAULT_BURST, run_deadline=DEFAULT_DEADLINE, cache=None,
+                 backend=None, planner=None, queue_budget=DEFAULT_QUEUE_BUDGET, breaker=None,
+                 site=None, region=REGION, bucket=None):
+    """
+    Паралельно завантажує сторінки сьогодні/завтра для всіх черг (порядок черг зберігається).
+    З planner (потрібен cache) сторінки, які зараз не можуть змінитися, не качаються - слоти з кешу.
+    queue_budget - сек на сторінки однієї черги; breaker - URL з відкритим breaker не качаються.
+    site - адреса сайту (локальний replay_server для тестів і бенчмарків).
+    bucket - спільний TokenBucket (кілька регіонів на одному хості), інакше свій з rate/burst.
+    """
+    queues = queues or region['queues']
+    started = time.monotonic()
+    now = int(time.time())
+    if cache:
+        cache.reset_stats()
+    pages = [(u, kind) for q in queues for u, kind in zip(get_queue_urls(q, site, region), ('today', 'tomorrow'))]
+    urls = [u for u, _ in pages]
+    to_fetch = urls
+    if planner and cache:
+        to_fetch = [u for u, kind in pages
+                    if cache.cached_slots(u) is None or planner.should_fetch(u, kind, now)[0]]
+        log(f"🗓️ Planner: fetch {len(to_fetch)}/{len(urls)}")
+    blocked = {}
+    if breaker:
+        blocked = {u: CircuitOpenError("circuit open") for u in to_fetch if not breaker.allow(u, now)}
+        if blocked:
+            log(f"🚧 Circuit open: {len(blocked)} URL пропущено")
+        to_fetch = [u for u in to_fetch if u not in blocked]
+    groups = {u: q for q in queues for u in get_queue_urls(q, site, region)}
+    bucket = bucket or TokenBucket(rate, burst)
+    responses = fetch_all(s, to_fetch, workers, bucket, started + run_deadline, cache,
+                          groups=groups, group_budget=queue_budget)
+    responses.update(blocked)
+    responses.update({u: None for u in urls if u not in responses})
+    if breaker:
+        for u in to_fetch:
+            if page_failed(responses[u]):
+                breaker.record_failure(u, responses[u] if isinstance(responses[u], Exception)
+                                       else f"HTTP {responses[u].status_code}", now)
             else:
-                slots[str(start_slot)] = "first"
+                breaker.record_success(u)
+        breaker.save()
+    qdata = [parse_queue(q, i + 1, responses, cache, backend, site, region) for i, q in enumerate(queues)]
+    log(f"⏱️ {len(to_fetch)} сторінок за {time.monotonic() - started:.1f}с (workers={workers}, rate={bucket.rate:g}/с)")
+    if planner and cache:
+        fetched = set(to_fetch)
+        for q in qdata:
+            if not q:
+                continue
+            tu, tmu = get_queue_urls(q['queue_key'], site, region)
+            for u, kind, slots in [(tu, 'today', q['today_slots']), (tmu, 'tomorrow', q['tomorrow_slots'])]:
+                if u in fetched and slots is not None:
+                    planner.observe(u, kind, slots, now)
+        planner.save()
+    if cache:
+        cache.save()
+        log(f"💾 HTTP кеш: {cache.summary()}")
+    return qdata
+
+def build_schedule(qd, now, queues=ALL_QUEUE_KEYS):
+    """
+    Результати parse_queue → (Schedule на сьогодні і завтра, неопубліковані черги-дні).
+    Черги без даних - missing; сторінка з 4xx ({} - напр. завтра ще не опубліковано) теж порожня
+    в документі, але не збій: такі (day, gpv) - у другому значенні.
+    """
+    td = now.replace(hour=0, minute=0, second=0, microsecond=0, tzinfo=KYIV_TZ)
+    tts, tmt = int(td.timestamp()), int((td + timedelta(days=1)).timestamp())
+    by_queue = {q['queue_key']: q for q in qd if q}
+    schedule = Schedule()
+    unpublished = set()
+    for ts, field in [(tts, 'today_slots'), (tmt, 'tomorrow_slots')]:
+        for qk in queues:
+            queue_data = by_queue.get(qk)
+            slots = queue_data[field] if queue_data else None
+            if slots == {}:
+                unpublished.add((ts, gpv_key(qk)))
+            schedule.add(QueueDay.from_slots(ts, gpv_key(qk), slots))
+    return schedule, unpublished
 
-        # Коригуємо останній слот якщо кінець не на 00 хв
-        if end_minute != 0:
-            last_full_hour = actual_end_hour - 1
-            last_slot = hour_to_slot(last_full_hour)
-            if last_slot <= 24 and not (end_hour == 23 and end_minute == 59):
-                if end_minute <= 30:
-                    slots[str(last_slot)] = "first"
-                else:
-                    slots[str(last_slot)] = "second"
+def load_fresh(path):
+    """Коли кожна черга-день востаннє успішно завантажувалась: {"<gpv>@<day>": timestamp}"""
+    if not path or not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        log(f"[WARN] Could not read {path}: {e}")
+        return {}
 
-    return slots
+def update_fresh(fresh, schedule, now_ts):
+    """Черги-дні з даними цього прогону → час останнього успіху (старі дні відкидаються)"""
+    keys = {f"{gpv}@{day}" for day, gpv in schedule.index}
+    fresh = {k: v for k, v in fresh.items() if k in keys}
+    fresh.update({f"{qd.gpv_key}@{qd.day}": now_ts for qd in schedule.index.values() if not qd.missing})
+    return fresh
 
-def get_queue_urls(q):
-    slug = q.replace('.', '-')
-    return BASE_URL.format(queue=slug), TOMORROW_URL.format(queue=slug)
+def fill_stale(schedule, prev, fresh=None, unpublished=()):
+    """
+    Черги-дні без даних (крім неопублікованих) → останні відомі слоти з попереднього GPV документа.
+    Повертає список {gpv, day, since}; since - останнє успішне завантаження черги-дня (fresh),
+    для старого стану без fresh - since з попереднього документа.
+    """
+    if not prev:
+        return []
+    fresh = fresh or {}
+    prev_data = prev.get('fact', {}).get('data', {})
+    prev_stale = {(s['day'], s['gpv']): s['since']
+                  for s in prev.get('lastUpdateStatus', {}).get('stale') or []}
+    stale = []
+    for day, gpv in schedule.missing():
+        if (day, gpv) in unpublished:
+            continue
+        slots = prev_data.get(str(day), {}).get(gpv)
+        if not slots:
+            continue
+        schedule.add(QueueDay.from_slots(day, gpv, slots))
+        since = fresh.get(f"{gpv}@{day}") or prev_stale.get((day, gpv), prev.get('lastUpdated'))
+        stale.append({'gpv': gpv, 'day': day, 'since': since})
+    return stale
 
-def parse_queue(s, q, i):
+def transform_to_gpv(qd, now):
+    return build_schedule(qd, now)[0].to_gpv()
+
+def write_json_atomic(path, obj, **dump_kwargs):
+    """Пише JSON через тимчасовий файл + rename, щоб читач ніколи не бачив половину файлу"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(obj, f, ensure_ascii=False, **dump_kwargs)
+    os.replace(tmp, path)
+
+def load_previous(path):
+    """Попередній збережений GPV документ (None, якщо його немає або він битий)"""
+    if not os.path.exists(path):
+        return None
     try:
-        time.sleep(1.5)
-        log(f"[{i:2d}/12] {q}")
-        tu, tmu = get_queue_urls(q)
-        tr, tmur = s.get(tu, timeout=30), s.get(tmu, timeout=30)
-        return {
-            'queue_key': q,
-            'today_slots': parse_html_schedule(tr.text) if tr.ok else {},
-            'tomorrow_slots': parse_html_schedule(tmur.text) if tmur.ok else {}
-        }
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
     except Exception as e:
-        log(f"[{i:2d}/12] ERROR: {e}")
+        log(f"[WARN] Could not read previous {path}: {e}")
         return None
 
-def transform_to_gpv(qd, now):
-    td = now.replace(hour=0, minute=0, second=0, microsecond=0, tzinfo=KYIV_TZ)
-    tts, tmt = int(td.timestamp()), int((td + timedelta(days=1)).timestamp())
-    data = {}
-    for ts in [tts, tmt]:
-        data[str(ts)] = {}
-        for qk in ALL_QUEUE_KEYS:
-            gpv_key = QUEUE_TO_GPV[qk]
-            queue_data = next((qd2 for qd2 in qd if qd2 and qd2['queue_key'] == qk), None)
-            if queue_data:
-                slots = queue_data['today_slots'] if ts == tts else queue_data['tomorrow_slots']
-            else:
-                slots = {str(i): "yes" for i in range(1, 25)}
-            data[str(ts)][gpv_key] = slots
-    return data
+def heartbeat_path(json_path):
+    """data/X.json → data/X.heartbeat.json"""
+    root, ext = os.path.splitext(str(json_path))
+    return f"{root}.heartbeat{ext or '.json'}"
 
-def save_results(qd_list):
+def content_changed(prev, result):
+    """Чи треба переписувати документ: змінився contentHash, день, регіон, назви черг або схема"""
+    if not prev:
+        return True
+    return any(prev.get(section, {}).get(key) != result[section][key]
+               for section, key in PUBLISH_KEYS) or prev.get('regionId') != result['regionId']
+
+def write_heartbeat(path, result, last_changed):
+    """Маленький файл стану кожного запуску: коли перевіряли, коли дані востаннє змінювались, статус"""
+    write_json_atomic(path, {
+        "regionId": result['regionId'],
+        "contentHash": result['meta']['contentHash'],
+        "lastChecked": result['lastUpdated'],
+        "lastChanged": last_changed,
+        "update": result['fact']['update'],
+        "lastUpdateStatus": result['lastUpdateStatus'],
+    }, indent=2)
+
+def save_results(qd_list, archive_path=ARCHIVE_PATH, output_path=OUTPUT_PATH, region=REGION, fresh_path=None):
+    """
+    Результати прогону → GPV JSON (тільки якщо розклад змінився) + heartbeat.
+    fresh_path - час останнього успішного завантаження кожної черги-дня (since застарілих даних)
+    """
     now = datetime.now(KYIV_TZ)
-    data = transform_to_gpv(qd_list, now)
+    prev = load_previous(output_path)
+    schedule, unpublished = build_schedule(qd_list, now, region['queues'])
+    fresh = update_fresh(load_fresh(fresh_path), schedule, int(now.timestamp()))
+    if fresh_path:
+        write_json_atomic(fresh_path, fresh, indent=1, sort_keys=True)
+    stale = fill_stale(schedule, prev, fresh, unpublished)
+    # збої - тільки те, що не завантажилось (мережа, 429/5xx, breaker); неопубліковане - не збій
+    missing = [key for key in schedule.missing() if key not in unpublished]
+    data = schedule.to_gpv()
     
     result = {
-        "regionId": "vinnytsia",
+        "regionId": region['id'],
         "lastUpdated": int(now.timestamp()),
         "fact": {
             "data": data,
@@ -190,36 +461,176 @@ def save_results(qd_list):
                 "6": "Субота",
                 "7": "Неділя"
             },
-            "sch_names": {f"GPV{k}": f"Черга {k}" for k in QUEUE_MAPPING},
+            "sch_names": {gpv_key(k): f"Черга {k}" for k in region['queues']},
             "updateFact": now.strftime('%d.%m.%Y %H:%M')
         },
         "lastUpdateStatus": {
-            "status": "parsed",
-            "ok": True,
+            "status": "partial" if stale or missing else "parsed",
+            "ok": not missing,
             "code": 200,
-            "message": None,
+            "message": f"stale: {len(stale)}, missing: {len(missing)}" if stale or missing else None,
             "at": int(now.timestamp()),
-            "attempt": 1
+            "attempt": 1,
+            "stale": stale
         },
-        "regionAffiliation": "Вінницька область",
+        "regionAffiliation": region['name'],
         "meta": {
             "schemaVersion": "1.0.0",
             "contentHash": hashlib.sha256(json.dumps(data, sort_keys=True).encode()).hexdigest()
         }
     }
     
-    os.makedirs("data", exist_ok=True)
-    with open("data/Vinnytsiaoblenerho.json", "w", encoding="utf-8") as f:
-        json.dump(result, f, ensure_ascii=False, indent=2)
-    
-    log(f"✅ SAVED: data/Vinnytsiaoblenerho.json ({len([q for q in qd_list if q])}/12)")
+    complete = f"{len([q for q in qd_list if queue_complete(q)])}/{len(region['queues'])}"
+    if not content_changed(prev, result):
+        # Розклад той самий: документ, компактна копія і дельта не чіпаються (ні коміту, ні перезавантаження
+        # у споживачів), свіжість і статус - тільки в heartbeat
+        write_heartbeat(heartbeat_path(output_path), result, prev.get('lastUpdated'))
+        log(f"💤 UNCHANGED: {output_path} (contentHash {result['meta']['contentHash'][:12]}, {complete}), "
+            f"heartbeat only")
+    else:
+        write_json_atomic(output_path, result, indent=2)
+        
+        # Компактна копія (48-бітні маски) з тим самим contentHash
+        save_compact(compact_path(output_path), result)
+        
+        # Дельта відносно попереднього файлу
+        delta = save_delta(output_path, prev, result)
+        log(f"🔀 Delta: {len(delta['changes'])} змін слотів")
+        
+        # Історичний архів (тільки нові contentHash)
+        if archive_path:
+            archive = ScheduleArchive(archive_path)
+            try:
+                if archive.record(result):
+                    log(f"🗄️ Archived: {archive_path}")
+            finally:
+                archive.close()
+        
+        write_heartbeat(heartbeat_path(output_path), result, result['lastUpdated'])
+        log(f"✅ SAVED: {output_path} ({complete})")
+    if stale:
+        log(f"🕰️ Застарілі дані: {', '.join(st['gpv'] + '@' + str(st['day']) for st in stale)}")
+    if missing:
+        log(f"⚠️ Без даних: {', '.join(f'{k}@{d}' for d, k in missing)}")
+    if unpublished:
+        log(f"🕓 Ще не опубліковано: {len(unpublished)}")
     return True
 
-def main():
-    log("🔌 GPV ВОЕ ВІННИЦЯ - BezSvitla Parser")
-    s = create_session()
-    qdata = [parse_queue(s, q, i + 1) for i, q in enumerate(ALL_QUEUE_KEYS)]
-    save_results(qdata)
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="GPV BezSvitla Parser")
+    p.add_argument('--region', choices=sorted(REGIONS), default=DEFAULT_REGION,
+                   help='регіон з scripts/regions.py (визначає URL, черги і шляхи файлів)')
+    p.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help='одночасних запитів')
+    p.add_argument('--rate', type=float, default=DEFAULT_RATE, help='запитів/сек')
+    p.add_argument('--burst', type=float, default=DEFAULT_BURST, help='запас токенів rate limiter')
+    p.add_argument('--deadline', type=float, default=DEFAULT_DEADLINE, help='сек на весь прогін')
+    p.add_argument('--queue-budget', type=float, default=DEFAULT_QUEUE_BUDGET,
+                   help='сек на сторінки однієї черги (з повторами)')
+    p.add_argument('--breaker-state', default=None, help='файл стану circuit breaker')
+    p.add_argument('--no-breaker', action='store_true', help='не пропускати URL, що падали раніше')
+    p.add_argument('--base-url', default=None, help='адреса сайту (напр. http://127.0.0.1:8765 - replay_server)')
+    p.add_argument('--output', default=None, help='файл GPV JSON')
+    p.add_argument('--cache', default=None, help='файл HTTP кешу сторінок')
+    p.add_argument('--no-cache', action='store_true', help='завантажувати і парсити всі сторінки')
+    p.add_argument('--archive', default=None, help='SQLite архів розкладів')
+    p.add_argument('--no-archive', action='store_true', help='не писати в архів')
+    p.add_argument('--adaptive', action='store_true',
+                   help='качати сторінки "завтра" тільки коли вони можуть змінитися (потрібен кеш)')
+    p.add_argument('--planner-state', default=None, help='файл стану планувальника')
+    p.add_argument('--extractor', choices=sorted(EXTRACTORS), default=DEFAULT_BACKEND,
+                   help='бекенд витягу інтервалів з HTML')
+    p.add_argument('--daemon', action='store_true', help='працювати постійно з внутрішнім розкладом')
+    p.add_argument('--interval', type=float, default=DEFAULT_INTERVAL, help='сек між запусками (--daemon)')
+    p.add_argument('--jitter', type=float, default=DEFAULT_JITTER, help='± сек випадкового зсуву (--daemon)')
+    p.add_argument('--status-file', default=None, help='файл стану демона')
+    p.add_argument('--fresh-state', default=None, help='файл часу останнього успіху кожної черги-дня')
+    args = p.parse_args(argv)
+
+    # Шляхи, не задані явно, - з реєстру регіонів
+    args.region = get_region(args.region)
+    paths = region_paths(args.region)
+    for attr, key in [('output', 'output'), ('cache', 'cache'), ('archive', 'archive'),
+                      ('planner_state', 'planner'), ('breaker_state', 'breaker'), ('status_file', 'status'),
+                      ('fresh_state', 'fresh')]:
+        if getattr(args, attr) is None:
+            setattr(args, attr, paths[key])
+    if args.base_url:
+        args.base_url = args.base_url.rstrip('/')
+    return args
+
+def run_cycle(s, cache, args, planner=None, breaker=None):
+    """Один повний прогін: завантаження → GPV JSON"""
+    qdata = fetch_queues(s, workers=args.workers, rate=args.rate,
+                         burst=args.burst, run_deadline=args.deadline, cache=cache,
+                         backend=args.extractor, planner=planner,
+                         queue_budget=args.queue_budget, breaker=breaker, site=args.base_url,
+                         region=args.region)
+    save_results(qdata, archive_path=None if args.no_archive else args.archive, output_path=args.output,
+                 region=args.region, fresh_path=args.fresh_state)
+    return qdata
+
+def run_daemon(s, cache, args, planner=None, breaker=None):
+    """
+    Демон: сесія і пул з'єднань живуть між циклами, запуск кожні interval ± jitter сек.
+    SIGTERM/SIGINT - дочекатися кінця поточного циклу і вийти.
+    Стан (останній успіх, тривалості циклів) - у args.status_file.
+    """
+    stop = threading.Event()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, lambda signum, frame: stop.set())
+
+    status = {
+        "pid": os.getpid(),
+        "state": "running",
+        "startedAt": int(time.time()),
+        "interval": args.interval,
+        "cycles": 0,
+        "failures": 0,
+        "lastCycleAt": None,
+        "lastSuccessAt": None,
+        "lastError": None,
+        "lastDurations": [],
+        "nextRunAt": None,
+    }
+    log(f"👻 Daemon: interval={args.interval}с ±{args.jitter}с, status → {args.status_file}")
+
+    while not stop.is_set():
+        started = time.time()
+        status["cycles"] += 1
+        status["lastCycleAt"] = int(started)
+        try:
+            run_cycle(s, cache, args, planner, breaker)
+            status["lastSuccessAt"] = int(time.time())
+            status["lastError"] = None
+        except Exception as e:
+            status["failures"] += 1
+            status["lastError"] = f"{type(e).__name__}: {e}"
+            log(f"❌ Cycle failed: {e}")
+        duration = round(time.time() - started, 2)
+        status["lastDurations"] = (status["lastDurations"] + [duration])[-STATUS_DURATIONS:]
+
+        delay = max(0.0, args.interval + random.uniform(-args.jitter, args.jitter) - duration)
+        status["nextRunAt"] = int(time.time() + delay)
+        write_json_atomic(args.status_file, status, indent=2)
+        log(f"💤 Next cycle in {delay:.0f}с")
+        stop.wait(delay)
+
+    status["state"] = "stopped"
+    status["nextRunAt"] = None
+    write_json_atomic(args.status_file, status, indent=2)
+    log("🛑 Daemon stopped")
+
+def main(argv=None):
+    args = parse_args(argv)
+    log(f"🔌 GPV {args.region['name']} - BezSvitla Parser")
+    s = create_session(args.workers)
+    cache = None if args.no_cache else ResponseCache(args.cache)
+    planner = PollPlanner(args.planner_state) if args.adaptive and cache else None
+    breaker = None if args.no_breaker else CircuitBreaker(args.breaker_state)
+    if args.daemon:
+        run_daemon(s, cache, args, planner, breaker)
+    else:
+        run_cycle(s, cache, args, planner, breaker)
     log("🎉 ГОТОВО!")
 
 if __name__ == "__main__":
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Кодування PNG для рендерерів
+- rgb     - RGB(A) через Pillow, як було (zlib рівень 1, фільтри Pillow); за замовчуванням, без втрат
+- palette - опційно (--png-mode palette), з втратами: індексована палітра до 256 кольорів: на зображеннях ~6 плоских кольорів + згладжування тексту
+            (~400-600 відтінків); 256 найчастіших - точно, решта (рідкісні пікселі краю літер) - найближчий
+            колір палітри. Рядки - фільтр Up (таблиця повторюється по вертикалі), zlib рівень 6, Z_FILTERED.
+            У ~2.5 рази менше байтів, на око - те саме зображення (~0.4% пікселів змінюються, до 17 на канал).
+Опційно - WebP (lossless) поруч з PNG: ще ~2 рази менше, ~30 мс на зображення.
+Байти детерміновані: тільки IHDR, pHYs (dpi), PLTE, IDAT, IEND - без часу і версій.
+"""
+import io
+import zlib
+import struct
+
+import numpy as np
+from PIL import Image
+
+PNG_MODES = ('rgb', 'palette')
+DEFAULT_PNG_MODE = 'rgb'
+PALETTE_COLORS = 256
+SAMPLE_STEP = 4
+ZLIB_LEVEL = 6
+ZLIB_STRATEGY = zlib.Z_FILTERED
+# rgb: zlib рівень 1 - кодування удвічі швидше за 6, файл все одно менший, ніж у matplotlib
+RGB_COMPRESS_LEVEL = 1
+WEBP_OPTIONS = dict(lossless=True, method=1, quality=0)
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+FILTER_UP = 2
+
+_mode = DEFAULT_PNG_MODE
+_webp = False
+# колір (24 біти RGB) → індекс палітри; записи попередніх зображень не чистяться - індекс перевіряється
+_lut = None
+
+def use_png_mode(mode=DEFAULT_PNG_MODE, webp=False):
+    """Режим кодування для всіх наступних PNG (і WebP поруч - webp=True)"""
+    global _mode, _webp
+    if mode not in PNG_MODES:
+        raise ValueError(f"Unknown PNG mode: {mode} (choose from {', '.join(PNG_MODES)})")
+    _mode, _webp = mode, webp
+
+def png_mode():
+    return _mode
+
+def webp_enabled():
+    return _webp
+
+def png_options():
+    """Те, від чого залежать байти PNG (для ключа кешу PNG)"""
+    if _mode == 'rgb':
+        return {'mode': _mode, 'level': RGB_COMPRESS_LEVEL}
+    return {'mode': _mode, 'colors': PALETTE_COLORS, 'level': ZLIB_LEVEL, 'strategy': ZLIB_STRATEGY}
+
+def _key_colors(keys):
+    """Ключі кольорів (r | g << 8 | b << 16) → RGB (n, 3) int32"""
+    return keys.astype('<u4').view(np.uint8).reshape(-1, 4)[:, :3].astype(np.int32)
+
+def to_indexed(rgb, colors=PALETTE_COLORS):
+    """RGB масив (h, w, 3) → (індекси uint8 (h, w), палітра (n, 3))"""
+    global _lut
+    h, w, _ = rgb.shape
+    rgba = np.zeros((h, w, 4), dtype=np.uint8)
+    rgba[..., :3] = rgb
+    packed = rgba.view('<u4')[..., 0]  # r | g << 8 | b << 16
+    # палітра - найчастіші кольори вибірки (кожен SAMPLE_STEP-й піксель по обох осях)
+    keys, counts = np.unique(packed[::SAMPLE_STEP, ::SAMPLE_STEP], return_counts=True)
+    palette_keys = keys[np.lexsort((keys, -counts))[:colors]]
+    if _lut is None:
+        _lut = np.zeros(1 << 24, dtype=np.uint8)
+    _lut[palette_keys] = np.arange(len(palette_keys), dtype=np.uint8)
+    index = _lut[packed]
+    # кольори не з палітри (рідкісні пікселі згладжування) - найближчий колір палітри
+    check = np.full(256, 0xFFFFFFFF, dtype=np.uint32)  # старший байт справжніх ключів - 0
+    check[:len(palette_keys)] = palette_keys
+    missing = check[index] != packed
+    if missing.any():
+        extra, inverse = np.unique(packed[missing], return_inverse=True)
+        palette = _key_colors(palette_keys)
+        nearest = ((_key_colors(extra)[:, None, :] - palette[None, :, :]) ** 2).sum(-1).argmin(1)
+        index[missing] = nearest.astype(np.uint8)[inverse]
+    return index, _key_colors(palette_keys).astype(np.uint8)
+
+def _chunk(tag, body):
+    return struct.pack('>I', len(body)) + tag + body + struct.pack('>I', zlib.crc32(tag + body))
+
+def encode_indexed(rgb, dpi):
+    """RGB масив → байти індексованого PNG"""
+    index, palette = to_indexed(rgb)
+    h, w = index.shape
+    raw = np.empty((h, w + 1), dtype=np.uint8)
+    raw[:, 0] = FILTER_UP
+    raw[0, 1:] = index[0]
+    np.subtract(index[1:], index[:-1], out=raw[1:, 1:])
+    compressor = zlib.compressobj(ZLIB_LEVEL, zlib.DEFLATED, 15, 9, ZLIB_STRATEGY)
+    ppm = round(dpi / 0.0254)
+    return b''.join([
+        PNG_SIGNATURE,
+        _chunk(b'IHDR', struct.pack('>IIBBBBB', w, h, 8, 3, 0, 0, 0)),
+        _chunk(b'pHYs', struct.pack('>IIB', ppm, ppm, 1)),
+        _chunk(b'PLTE', palette.tobytes()),
+        _chunk(b'IDAT', compressor.compress(raw.tobytes()) + compressor.flush()),
+        _chunk(b'IEND', b''),
+    ])
+
+def save_rgb(rgb, output_file, dpi):
+    """RGB масив → PNG у поточному режимі (output_file - шлях або файловий об'єкт)"""
+    if _mode == 'rgb':
+        # без pnginfo Pillow не пише tEXt/tIME: байти залежать тільки від пікселів і dpi
+        Image.fromarray(rgb).save(output_file, 'PNG', dpi=(dpi, dpi), compress_level=RGB_COMPRESS_LEVEL)
+        return
+    png = encode_indexed(rgb, dpi)
+    if hasattr(output_file, 'write'):
+        output_file.write(png)
+    else:
+        with open(output_file, 'wb') as f:
+            f.write(png)
+
+def encode_webp(png):
+    """Байти PNG → байти WebP (lossless)"""
+    buf = io.BytesIO()
+    Image.open(io.BytesIO(png)).save(buf, 'WEBP', **WEBP_OPTIONS)
+    return buf.getvalue()
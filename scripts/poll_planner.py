@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Адаптивний планувальник опитування сторінок "на завтра"
+Сторінки "сьогодні" качаються щозапуску. Для сторінок "завтра" планувальник пам'ятає,
+коли вони змінювалися, і вирішує на кожен запуск:
+- новий день або немає кешу           → качати
+- у вікні публікації (вивчене з історії) → качати щозапуску
+- до 2 год після зміни будь-якої сторінки "завтра" (графік публікують для всіх черг разом)
+                                        → качати щозапуску
+- опубліковано і стабільно              → раз на 30 хв
+- поза вікном і ще не опубліковано      → раз на годину
+Рідкі перевірки рознесені між чергами за фазами, тож якась черга перевіряється майже щозапуску,
+і перша ж помічена зміна вмикає часте опитування всіх.
+Пропущена сторінка береться з HTTP кешу.
+
+Симуляція (запити і затримка виявлення змін проти "качати все щоразу"):
+    python scripts/poll_planner.py --simulate --days 14
+"""
+import json
+import os
+import random
+import hashlib
+import argparse
+from datetime import datetime, timezone, timedelta
+
+from regions import get_region, region_paths
+
+KYIV_TZ = timezone(timedelta(hours=2))
+
+RUN_INTERVAL = 600          # сек між запусками парсера
+QUIET_INTERVAL = 3600       # поза вікном, ще не опубліковано
+STABLE_INTERVAL = 1800      # опубліковано, змін давно не було
+REVISION_WINDOW = 7200      # стільки після зміни качаємо щозапуску
+WINDOW_MARGIN = 60          # хв запасу до/після вивченого вікна
+DEFAULT_WINDOW = (13 * 60, 24 * 60)  # хв доби, поки історії мало
+MIN_HISTORY = 3
+MAX_HISTORY = 30
+# той самий файл, що й у parser.py для регіону за замовчуванням
+PLANNER_PATH = region_paths(get_region())['planner']
+
+def slots_digest(slots):
+    return hashlib.sha256(json.dumps(slots, sort_keys=True).encode()).hexdigest()
+
+def _day_and_minute(now):
+    t = datetime.fromtimestamp(now, tz=KYIV_TZ)
+    return t.strftime('%Y-%m-%d'), t.hour * 60 + t.minute
+
+def _percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+def _phase(url, period):
+    return int(hashlib.md5(url.encode()).hexdigest(), 16) % period
+
+class PollPlanner:
+    """
+    Стан: {urls: {url: {day, digest, last_fetch, changed_at}},
+           last_change: {day, at}, publish_minutes: [...]}
+    """
+
+    def __init__(self, path=PLANNER_PATH):
+        self.path = path
+        self.urls = {}
+        self.last_change = {}
+        self.publish_minutes = []
+        self.load()
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                raw = json.load(f)
+            self.urls = raw.get('urls', {})
+            self.last_change = raw.get('last_change', {})
+            self.publish_minutes = raw.get('publish_minutes', [])
+        except Exception as e:
+            print(f"[WARN] Could not read planner state {self.path}: {e}")
+
+    def save(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'urls': self.urls, 'last_change': self.last_change,
+                       'publish_minutes': self.publish_minutes}, f)
+        os.replace(tmp, self.path)
+
+    def publish_window(self):
+        """Вікно публікації графіка на завтра (хв доби)"""
+        if len(self.publish_minutes) < MIN_HISTORY:
+            return DEFAULT_WINDOW
+        return (max(0, _percentile(self.publish_minutes, 0.1) - WINDOW_MARGIN),
+                min(24 * 60, _percentile(self.publish_minutes, 0.9) + WINDOW_MARGIN))
+
+    def _due(self, url, state, now, interval):
+        """Рідке опитування: URL має свою фазу в періоді interval, але не рідше ніж раз на 2 × interval"""
+        period = max(1, interval // RUN_INTERVAL)
+        if now - state['last_fetch'] >= 2 * interval - RUN_INTERVAL / 2:
+            return True
+        return (now // RUN_INTERVAL) % period == _phase(url, period)
+
+    def should_fetch(self, url, kind, now):
+        """(качати?, причина) для URL на момент now"""
+        if kind != 'tomorrow':
+            return True, 'today'
+        state = self.urls.get(url)
+        day, minute = _day_and_minute(now)
+        if not state or state['day'] != day:
+            return True, 'new day'
+        if self.last_change.get('day') == day and now - self.last_change['at'] < REVISION_WINDOW:
+            return True, 'recent change'
+        if state.get('changed_at') is not None:
+            return self._due(url, state, now, STABLE_INTERVAL), 'stable'
+        lo, hi = self.publish_window()
+        if lo <= minute < hi:
+            return True, 'publish window'
+        return self._due(url, state, now, QUIET_INTERVAL), 'quiet'
+
+    def observe(self, url, kind, slots, now):
+        """Результат завантаження URL; зміна в межах дня для "завтра" - подія публікації/уточнення"""
+        if kind != 'tomorrow':
+            return
+        day, minute = _day_and_minute(now)
+        digest = slots_digest(slots)
+        state = self.urls.get(url)
+        if not state or state['day'] != day:
+            self.urls[url] = {'day': day, 'digest': digest, 'last_fetch': now, 'changed_at': None}
+            return
+        if digest != state['digest']:
+            if self.last_change.get('day') != day:
+                # перша зміна за день - публікація графіка на завтра
+                self.publish_minutes = (self.publish_minutes + [minute])[-MAX_HISTORY:]
+            self.last_change = {'day': day, 'at': now}
+            state['changed_at'] = now
+            state['digest'] = digest
+        state['last_fetch'] = now
+
+def simulate(days=14, queues=12, seed=0):
+    """
+    Синтетичні дні: графік на завтра публікується ~18:00 ± 1 год (усі черги разом),
+    з імовірністю 40% - уточнення через 20-180 хв. Запуск парсера кожні 10 хв.
+    Порівнює "качати все" з планувальником: кількість запитів і затримку виявлення змін.
+    """
+    rng = random.Random(seed)
+    start = int(datetime(2025, 12, 1, tzinfo=KYIV_TZ).timestamp())
+    urls = [f"q{i}/zavtra" for i in range(queues)]
+
+    # Події змін: {url: [час зміни, ...]}
+    events = {u: [] for u in urls}
+    for d in range(days):
+        day0 = start + d * 86400
+        publish = day0 + int(max(12 * 60, min(23 * 60, rng.gauss(18 * 60, 60)))) * 60
+        revision = publish + rng.randint(20, 180) * 60 if rng.random() < 0.4 else None
+        for u in urls:
+            events[u].append(publish + rng.randint(0, 5) * 60)
+            if revision and revision < day0 + 86400:
+                events[u].append(revision)
+
+    def version(u, t):
+        return {'v': sum(1 for e in events[u] if e <= t), 'day': _day_and_minute(t)[0]}
+
+    planner = PollPlanner(path=None)
+    runs = range(start, start + days * 86400, RUN_INTERVAL)
+    fetched = {u: [] for u in urls}
+    for t in runs:
+        for u in urls:
+            go, _ = planner.should_fetch(u, 'tomorrow', t)
+            if go:
+                fetched[u].append(t)
+                planner.observe(u, 'tomorrow', version(u, t), t)
+
+    def latencies(fetch_times):
+        out = []
+        for u in urls:
+            times = fetch_times(u)
+            for e in events[u]:
+                nxt = next((t for t in times if t >= e), None)
+                if nxt is not None:
+                    out.append((nxt - e) / 60)
+        return out
+
+    base_times = list(runs)
+    base_lat = latencies(lambda u: base_times)
+    plan_lat = latencies(lambda u: fetched[u])
+    base_requests = len(base_times) * len(urls)
+    plan_requests = sum(len(v) for v in fetched.values())
+    today_requests = len(base_times) * len(urls)
+
+    print(f"[SIM] {days} днів, {queues} черг, запуск кожні {RUN_INTERVAL // 60} хв")
+    print(f"[SIM] Вікно публікації (вивчене): {planner.publish_window()[0] // 60:02d}:{planner.publish_window()[0] % 60:02d}"
+          f"-{planner.publish_window()[1] // 60:02d}:{planner.publish_window()[1] % 60:02d}")
+    print(f"[SIM] Запити 'завтра': все щоразу={base_requests}, планувальник={plan_requests} "
+          f"(-{100 - plan_requests * 100 // base_requests}%)")
+    print(f"[SIM] Усі запити (з 'сьогодні'): {base_requests + today_requests} → {plan_requests + today_requests} "
+          f"(-{100 - (plan_requests + today_requests) * 100 // (base_requests + today_requests)}%)")
+    print(f"[SIM] Затримка виявлення, хв: все щоразу avg={sum(base_lat) / len(base_lat):.1f} max={max(base_lat):.0f}; "
+          f"планувальник avg={sum(plan_lat) / len(plan_lat):.1f} max={max(plan_lat):.0f}")
+    return base_requests, plan_requests, base_lat, plan_lat
+
+if __name__ == '__main__':
+    p = argparse.ArgumentParser()
+    p.add_argument('--simulate', action='store_true', required=True)
+    p.add_argument('--days', type=int, default=14)
+    p.add_argument('--queues', type=int, default=12)
+    p.add_argument('--seed', type=int, default=0)
+    args = p.parse_args()
+
+    simulate(args.days, args.queues, args.seed)
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Реєстр регіонів (обленерго), які обробляє парсер
+Для кожного регіону: шаблон URL сторінок черг на bezsvitla, набір черг, назва і базове ім'я файлів.
+З базового імені (file) виводяться всі шляхи:
+    data/<file>.json, images/<file>/, archive/<file>.sqlite, cache/<file>-*.json
+
+Новий регіон - новий запис у REGIONS (slug - частина URL bezsvitla, напр. "vinnytska-oblast").
+
+    python scripts/regions.py            # список регіонів і їхніх шляхів
+"""
+import json
+import argparse
+
+DEFAULT_REGION = "vinnytsia"
+SITE_URL = "https://bezsvitla.com.ua"
+QUEUE_URL = "{site}/{slug}/cherha-{queue}"
+TOMORROW_SUFFIX = "/grafik-na-zavtra"
+
+# 6 груп × 2 підгрупи
+STANDARD_QUEUES = [f"{g}.{s}" for g in range(1, 7) for s in (1, 2)]
+
+REGIONS = {
+    "vinnytsia": {
+        "name": "Вінницька область",
+        "file": "Vinnytsiaoblenerho",
+        "site": SITE_URL,
+        "slug": "vinnytska-oblast",
+        "queues": STANDARD_QUEUES,
+    },
+}
+
+def get_region(region_id=DEFAULT_REGION):
+    """Запис реєстру з id (KeyError з переліком відомих, якщо такого немає)"""
+    try:
+        return dict(REGIONS[region_id], id=region_id)
+    except KeyError:
+        raise KeyError(f"unknown region {region_id!r} (known: {', '.join(sorted(REGIONS))})") from None
+
+def region_paths(region):
+    """Шляхи файлів регіону"""
+    name = region['file']
+    return {
+        'output': f"data/{name}.json",
+        'images': f"images/{name}",
+        'archive': f"archive/{name}.sqlite",
+        'cache': f"cache/{name}-http.json",
+        'planner': f"cache/{name}-planner.json",
+        'breaker': f"cache/{name}-breaker.json",
+        'status': f"cache/{name}-status.json",
+        'fresh': f"cache/{name}-fresh.json",
+    }
+
+def queue_urls(region, queue, site=None):
+    """URL сторінок сьогодні / завтра для черги регіону (site - заміна адреси сайту)"""
+    base = QUEUE_URL.format(site=site or region['site'], slug=region['slug'], queue=queue.replace('.', '-'))
+    return base, base + TOMORROW_SUFFIX
+
+def gpv_key(queue):
+    return f"GPV{queue}"
+
+if __name__ == '__main__':
+    p = argparse.ArgumentParser()
+    p.add_argument('--json', action='store_true', help='вивести реєстр як JSON')
+    args = p.parse_args()
+
+    if args.json:
+        print(json.dumps({rid: dict(get_region(rid), paths=region_paths(get_region(rid))) for rid in REGIONS},
+                         ensure_ascii=False, indent=2))
+    else:
+        for rid in REGIONS:
+            region = get_region(rid)
+            print(f"{rid}: {region['name']} ({len(region['queues'])} черг) → {region_paths(region)['output']}")
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Всі PNG одним процесом: окремі черги + таблиці усіх черг на сьогодні і завтра
+GPV JSON читається один раз, бекенд рендеру імпортується один раз (mpl - фігури перевикористовуються,
+raster - NumPy + Pillow без matplotlib). Регенерація - за тими ж правилами hash/date, що й в окремих скриптах;
+стан - у <out>/render-manifest.json, записується атомарно один раз наприкінці прогону.
+Час імпорту, кожного зображення і загальний час - у [TIME] рядках.
+--jobs N: черги, що потребують регенерації, малюються пулом з N процесів (кожен воркер один раз
+завантажує JSON і бекенд і тримає їх "теплими"). Рішення hash/date і маніфест - тільки в головному
+процесі, по черзі в порядку черг, тож результат не залежить від кількості воркерів.
+Кеш PNG за вмістом (render_cache.py, --png-cache, за замовчуванням cache/render-png): зображення з тим
+самим вмістом не малюється повторно, а береться з кешу; підсумок - у рядку [CACHE].
+Кодування PNG - png_encode.py (--png-mode rgb за замовчуванням, palette - менше, з втратами; --webp - WebP поруч).
+--svg: ще й SVG тих самих зображень (render_svg.py, без matplotlib, ~0.05 мс на зображення).
+--atlas: усі черги в одному gpv-atlas.png + карта координат gpv-atlas.json (render_atlas.py, інкрементально).
+
+    python scripts/render_all.py --json data/Vinnytsiaoblenerho.json --out images/Vinnytsiaoblenerho
+    python scripts/render_all.py --json ... --out ... --only today,tomorrow
+    python scripts/render_all.py --json ... --out ... --backend raster
+    python scripts/render_all.py --json ... --out ... --jobs 4
+    python scripts/render_all.py --json ... --out ... --png-mode rgb --webp
+    python scripts/render_all.py --json ... --out ... --svg
+    python scripts/render_all.py --json ... --out ... --atlas
+"""
+import os
+import sys
+import time
+import argparse
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+_started = time.perf_counter()
+from render_common import (RenderData, BACKENDS, DEFAULT_BACKEND, get_backend, needs_render, mark_rendered,
+                           commit_manifests, stats_line, OUTPUT_STATS, use_png_cache, png_cache, PNG_CACHE_DIR)
+from png_encode import PNG_MODES, DEFAULT_PNG_MODE, use_png_mode, png_mode, webp_enabled
+from render_png import render_queue, draw_queue, queue_target, format_gpv_filename, output_dir
+from render_png_all_today import render_today
+from render_png_all_tomorrow import render_tomorrow
+IMPORT_SECONDS = time.perf_counter() - _started
+
+ARTIFACTS = ('queues', 'today', 'tomorrow')
+
+def plan_artifacts(data, only=ARTIFACTS, gpv_key=None):
+    """Список (файл, функція, аргументи після data/out_p) для рендеру"""
+    jobs = []
+    if 'queues' in only:
+        for gkey in ([gpv_key] if gpv_key else data.gpv_keys(data.today_ts)):
+            jobs.append((format_gpv_filename(gkey), render_queue, (gkey,)))
+    if 'today' in only:
+        jobs.append(('gpv-all-today.png', render_today, ()))
+    if 'tomorrow' in only:
+        jobs.append(('gpv-all-tomorrow.png', render_tomorrow, ()))
+    return jobs
+
+# === Пул процесів для черг (--jobs) ===
+
+_worker = {}
+
+def _init_worker(json_path, backend, cache_dir, mode, webp):
+    """Один раз на воркер: дані, бекенд (matplotlib/шаблони лишаються теплими між чергами), кеш і режим PNG"""
+    _worker['data'] = RenderData.load(json_path)
+    _worker['backend'] = backend
+    get_backend(backend)
+    use_png_cache(cache_dir)
+    use_png_mode(mode, webp)
+
+def _render_in_worker(gkey, output_file):
+    """Тільки малювання і запис PNG; облік hash/date - у головному процесі. → (мс, 'hit'/'miss'/None, записано)"""
+    started = time.perf_counter()
+    cached, written = draw_queue(_worker['data'], gkey, Path(output_file), _worker['backend'])
+    return (time.perf_counter() - started) * 1000, cached, written
+
+def render_queues_parallel(json_path, data, gkeys, out_p, backend, jobs, stats):
+    """
+    Черги пулом з jobs процесів. Що регенерувати, вирішується тут (needs_render), воркери лише малюють;
+    mark_rendered - після успіху кожної, у порядку gkeys.
+    """
+    pending = []
+    for gkey in gkeys:
+        stats['checked'] += 1
+        target = queue_target(data, gkey, out_p)
+        if needs_render(*target):
+            pending.append((gkey, target))
+        else:
+            stats['skipped'] += 1
+    if not pending:
+        return
+    cache = png_cache()
+    with ProcessPoolExecutor(max_workers=min(jobs, len(pending)), initializer=_init_worker,
+                             initargs=(json_path, backend, cache and str(cache.directory), png_mode(),
+                                       webp_enabled())) as pool:
+        futures = [pool.submit(_render_in_worker, gkey, str(target[0])) for gkey, target in pending]
+        for (gkey, (output_file, manifest, stem, new_hash, date_code)), future in zip(pending, futures):
+            stats['times'][output_file.name], cached, written = future.result()
+            OUTPUT_STATS['written' if written else 'identical'] += 1
+            if cached:
+                # статистика кешу воркера → кеш головного процесу
+                cache.stats['hits' if cached == 'hit' else 'misses'] += 1
+                cache.stats['stored'] += cached == 'miss'
+            print(f"[OK] {output_file}")
+            mark_rendered(manifest, stem, new_hash, date_code, output_file)
+            stats['generated'] += 1
+
+def render_all(json_path, out_path=None, only=ARTIFACTS, gpv_key=None, backend=DEFAULT_BACKEND, jobs=1,
+               cache_dir=None, mode=DEFAULT_PNG_MODE, webp=False, svg=False, atlas=False):
+    """
+    Рендерить вибрані зображення (cache_dir - кеш PNG за вмістом, mode - кодування PNG, webp - WebP поруч,
+    svg - SVG поруч, atlas - атлас черг з картою координат).
+    Повертає stats з часами ({файл: мс})
+    """
+    started = time.perf_counter()
+    OUTPUT_STATS.clear()  # [STATS] - тільки цього виклику (run_regions рендерить кілька регіонів одним процесом)
+    cache = use_png_cache(cache_dir)
+    use_png_mode(mode, webp)
+    get_backend(backend)
+    backend_ms = (time.perf_counter() - started) * 1000
+    data = RenderData.load(json_path)
+    out_p = output_dir(out_path)
+    load_ms = (time.perf_counter() - started) * 1000
+
+    stats = {'checked': 0, 'generated': 0, 'skipped': 0, 'times': {}}
+    artifacts = plan_artifacts(data, only, gpv_key)
+    if jobs > 1:
+        gkeys = [extra[0] for _, render, extra in artifacts if render is render_queue]
+        artifacts = [a for a in artifacts if a[1] is not render_queue]
+        render_queues_parallel(json_path, data, gkeys, out_p, backend, jobs, stats)
+    for name, render, extra in artifacts:
+        t0 = time.perf_counter()
+        generated = render(data, *extra, out_p, backend)
+        stats['times'][name] = (time.perf_counter() - t0) * 1000
+        stats['checked'] += 1
+        stats['generated' if generated else 'skipped'] += 1
+
+    commit_manifests()
+    if svg:
+        from render_svg import render_svgs
+        t0 = time.perf_counter()
+        svg_times = render_svgs(data, out_p, only, gpv_key)
+        stats['svg_ms'] = (time.perf_counter() - t0) * 1000
+        print(f"[TIME] svg: {len(svg_times)} files, {stats['svg_ms']:.1f} ms")
+    if atlas and 'queues' in only:
+        from render_atlas import render_atlas
+        t0 = time.perf_counter()
+        render_atlas(data, out_p)
+        stats['atlas_ms'] = (time.perf_counter() - t0) * 1000
+        print(f"[TIME] atlas: {stats['atlas_ms']:.1f} ms")
+
+    total_ms = (time.perf_counter() - started) * 1000
+    print()
+    print(f"[TIME] import: {IMPORT_SECONDS * 1000:.0f} ms, backend {backend}: {backend_ms:.0f} ms, "
+          f"load: {load_ms - backend_ms:.1f} ms")
+    for name, ms in stats['times'].items():
+        print(f"[TIME] {name}: {ms:.1f} ms")
+    print(f"[TIME] total: {total_ms:.0f} ms")
+    if cache:
+        cache.evict()
+        print(f"[CACHE] {cache.summary()}")
+        stats['cache'] = dict(cache.stats)
+    print(f"\n{stats_line(stats)}")
+    stats['output'] = dict(OUTPUT_STATS)
+    stats['total_ms'] = total_ms
+    return stats
+
+def parse_only(value):
+    only = tuple(v.strip() for v in value.split(',') if v.strip())
+    unknown = set(only) - set(ARTIFACTS)
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown: {', '.join(sorted(unknown))} (choose from {', '.join(ARTIFACTS)})")
+    return only
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--json', required=True)
+    parser.add_argument('--out', default=None)
+    parser.add_argument('--only', type=parse_only, default=ARTIFACTS, help='queues,today,tomorrow')
+    parser.add_argument('--gpv', default=None, help='тільки одна черга (для queues)')
+    parser.add_argument('--backend', choices=sorted(BACKENDS), default=DEFAULT_BACKEND,
+                        help='mpl - matplotlib, raster - NumPy + Pillow (швидше, без matplotlib)')
+    parser.add_argument('--jobs', type=int, default=1,
+                        help=f'процесів для черг (0 - за кількістю CPU, тут {os.cpu_count()})')
+    parser.add_argument('--png-cache', default=str(PNG_CACHE_DIR), help='папка кешу PNG за вмістом')
+    parser.add_argument('--no-png-cache', action='store_true')
+    parser.add_argument('--png-mode', choices=PNG_MODES, default=DEFAULT_PNG_MODE,
+                        help='rgb - без втрат (як раніше), palette - індексована палітра (у ~2.5 рази менше, з втратами)')
+    parser.add_argument('--webp', action='store_true', help='ще й WebP (lossless) поруч з кожним PNG')
+    parser.add_argument('--svg', action='store_true', help='ще й SVG тих самих зображень (render_svg.py)')
+    parser.add_argument('--atlas', action='store_true',
+                        help='ще й атлас черг gpv-atlas.png + gpv-atlas.json (render_atlas.py)')
+    args = parser.parse_args()
+    jobs = args.jobs or os.cpu_count() or 1
+
+    try:
+        render_all(args.json, args.out, args.only, args.gpv, args.backend, jobs,
+                   None if args.no_png_cache else args.png_cache, args.png_mode, args.webp, args.svg, args.atlas)
+    except ImportError as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Атлас черг: усі gpv-X-Y-emergency.png в одному зображенні + JSON карта координат
+Клієнт завантажує один файл замість 12 і вирізає потрібну чергу за картою:
+    gpv-atlas.png  - плитки сіткою ATLAS_COLUMNS × n (порядок черг, комірка - найбільша плитка)
+    gpv-atlas.json - {hash, width, height, tiles: {GPV1.1: {x, y, w, h, file, sha256}}}
+hash - SHA256 по (черга, SHA256 плитки): однакові плитки → однаковий hash, незалежно від кодування атласу.
+Інкрементально: перемальовуються тільки черги, що змінилися (маніфест render_png / render_all), в атлас
+вставляються тільки плитки зі зміненим SHA256. Основа - пікселі попереднього атласу в
+cache/render-atlas/<image_sha256>.npy (~30 мс замість ~350 мс декодування PNG атласу; точні й для palette,
+де повторне квантування атласу зсувало б палітру). Весь атлас з плиток збирається, якщо змінився набір черг
+або розмір комірки, атласу немає / він не той, що в карті, або немає його .npy. Без змін - [SKIP] за ~10 мс.
+
+    python scripts/render_atlas.py --json data/Vinnytsiaoblenerho.json --out images/Vinnytsiaoblenerho
+    python scripts/render_all.py --json ... --out ... --atlas
+"""
+import io
+import os
+import json
+import argparse
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from png_encode import save_rgb, webp_enabled
+from render_common import RenderData, DPI, data_hash, file_hash, write_if_changed, write_webp
+from render_png import format_gpv_filename, output_dir
+
+ATLAS_NAME = 'gpv-atlas.png'
+ATLAS_MAP_NAME = 'gpv-atlas.json'
+ATLAS_VERSION = 1
+# 2 колонки: X.1 і X.2 поруч, рядок - номер черги
+ATLAS_COLUMNS = 2
+BACKGROUND = 255
+# Пікселі останнього атласу (RGB до кодування) - основа для вставки змінених плиток
+PIXELS_DIR = Path('cache') / 'render-atlas'
+
+def load_map(path):
+    """Попередня карта атласу ({} - немає або інша версія)"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            raw = json.load(f)
+        return raw if raw.get('version') == ATLAS_VERSION else {}
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        print(f"[WARN] Could not read atlas map {path}: {e}")
+        return {}
+
+def layout_tiles(tiles):
+    """[(черга, файл, (w, h))] → розмір атласу і {черга: x, y, w, h} (комірка - найбільша плитка)"""
+    cell_w = max(size[0] for _, _, size in tiles)
+    cell_h = max(size[1] for _, _, size in tiles)
+    rects = {}
+    for i, (gkey, _, (w, h)) in enumerate(tiles):
+        rects[gkey] = {'x': i % ATLAS_COLUMNS * cell_w, 'y': i // ATLAS_COLUMNS * cell_h, 'w': w, 'h': h}
+    rows = -(-len(tiles) // ATLAS_COLUMNS)
+    return (min(len(tiles), ATLAS_COLUMNS) * cell_w, rows * cell_h), rects
+
+def read_rgb(path):
+    return np.asarray(Image.open(path).convert('RGB'))
+
+def load_pixels(pixels_dir, image_sha, size):
+    """Пікселі атласу з PNG image_sha (None - немає, пошкоджені або інший розмір)"""
+    if not image_sha:
+        return None
+    try:
+        pixels = np.load(Path(pixels_dir) / f'{image_sha[:32]}.npy')
+    except (OSError, ValueError, EOFError):
+        return None
+    return pixels if pixels.shape == (size[1], size[0], 3) else None
+
+def save_pixels(pixels_dir, image_sha, pixels, old_sha=None):
+    """Пікселі нового атласу замість попередніх (tmp + os.replace)"""
+    pixels_dir = Path(pixels_dir)
+    path = pixels_dir / f'{image_sha[:32]}.npy'
+    try:
+        pixels_dir.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f'.{path.stem}.{os.getpid()}.tmp')
+        with open(tmp, 'wb') as f:
+            np.save(f, pixels)
+        os.replace(tmp, path)
+        if old_sha and old_sha[:32] != image_sha[:32]:
+            (pixels_dir / f'{old_sha[:32]}.npy').unlink(missing_ok=True)
+    except OSError as e:
+        print(f"[WARN] Could not save atlas pixels {path}: {e}")
+
+def render_atlas(data, out_p, pixels_dir=PIXELS_DIR):
+    """
+    Атлас з наявних PNG черг у out_p (рендер черг - до виклику). True - атлас записано.
+    pixels_dir - пікселі попереднього атласу для вставки тільки змінених плиток.
+    """
+    out_p = Path(out_p)
+    atlas_file = out_p / ATLAS_NAME
+    map_file = out_p / ATLAS_MAP_NAME
+
+    tiles = []
+    for gkey in data.gpv_keys(data.today_ts):
+        tile_file = out_p / format_gpv_filename(gkey)
+        if not tile_file.exists():
+            print(f"[WARN] {ATLAS_NAME}: {tile_file.name} not found, queue {gkey} left out")
+            continue
+        with Image.open(tile_file) as im:
+            tiles.append((gkey, tile_file, im.size))
+    if not tiles:
+        print(f"[SKIP] {ATLAS_NAME} (no queue images)")
+        return False
+
+    size, rects = layout_tiles(tiles)
+    hashes = {gkey: file_hash(tile_file) for gkey, tile_file, _ in tiles}
+    prev = load_map(map_file)
+    prev_tiles = prev.get('tiles', {})
+
+    # склад атласу не змінився, якщо ті самі плитки на тих самих місцях і атлас на диску - той, що в карті
+    changed = [g for g in rects if prev_tiles.get(g, {}).get('sha256') != hashes[g]]
+    same_layout = (list(prev_tiles) == list(rects) and (prev.get('width'), prev.get('height')) == size
+                   and all({k: prev_tiles[g].get(k) for k in rects[g]} == rects[g] for g in rects)
+                   and atlas_file.exists() and prev.get('image_sha256') == file_hash(atlas_file))
+    if same_layout and not changed:
+        print(f"[SKIP] {ATLAS_NAME} (no tile changes)")
+        return False
+
+    atlas = load_pixels(pixels_dir, prev.get('image_sha256'), size) if same_layout else None
+    if atlas is not None:
+        blit = changed
+    else:
+        atlas = np.full((size[1], size[0], 3), BACKGROUND, dtype=np.uint8)
+        blit = list(rects)
+    files = {gkey: tile_file for gkey, tile_file, _ in tiles}
+    for gkey in blit:
+        r = rects[gkey]
+        atlas[r['y']:r['y'] + r['h'], r['x']:r['x'] + r['w']] = read_rgb(files[gkey])
+
+    buf = io.BytesIO()
+    save_rgb(atlas, buf, DPI)
+    png = buf.getvalue()
+    write_if_changed(atlas_file, png)
+    if webp_enabled():
+        write_webp(atlas_file)
+
+    # карта - після атласу: якщо запис обірветься між ними, image_sha256 не збіжеться → збірка наступного разу
+    tile_map = {gkey: {**rects[gkey], 'file': tile_file.name, 'sha256': hashes[gkey]}
+                for gkey, tile_file, _ in tiles}
+    atlas_map = {
+        'version': ATLAS_VERSION,
+        'image': ATLAS_NAME,
+        'hash': data_hash([[gkey, hashes[gkey]] for gkey in rects]),
+        'image_sha256': file_hash(atlas_file),
+        'width': size[0],
+        'height': size[1],
+        'tiles': tile_map,
+    }
+    write_if_changed(map_file, json.dumps(atlas_map, ensure_ascii=False, indent=1).encode())
+    save_pixels(pixels_dir, atlas_map['image_sha256'], atlas, prev.get('image_sha256'))
+    print(f"[ATLAS] {atlas_file} ({len(blit)} of {len(tiles)} tiles blitted, {size[0]}×{size[1]}, "
+          f"{len(png) / 1024:.0f} KB)")
+    return True
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--json', required=True)
+    parser.add_argument('--out', default=None, help='папка з PNG черг (рендер - render_png.py / render_all.py)')
+    args = parser.parse_args()
+
+    render_atlas(RenderData.load(args.json), output_dir(args.out))
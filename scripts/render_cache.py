@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Кеш готових PNG за вмістом (content-addressed)
+Ключ - SHA256 від усього, що видно на зображенні: коди станів, підписи дат / назви черг, заголовок,
+футер, версія розкладки і бекенду. Однаковий вміст (той самий графік черги, що повернувся, повторний
+рендер після втрати маніфесту, інша папка виходу) → файл береться з кешу жорстким посиланням або копією
+замість малювання.
+Витіснення LRU: час використання - mtime файлу (оновлюється при влучанні), ліміти на сумарний розмір
+і вік записів.
+
+    python scripts/render_cache.py              # стан кешу
+    python scripts/render_cache.py --evict      # витіснити за лімітами
+"""
+import os
+import json
+import time
+import shutil
+import hashlib
+import argparse
+from pathlib import Path
+from collections import Counter
+
+PNG_CACHE_DIR = Path('cache') / 'render-png'
+MAX_BYTES = 64 * 1024 * 1024
+MAX_AGE_DAYS = 30
+
+def content_key(payload):
+    """SHA256 JSON представлення вмісту зображення"""
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, ensure_ascii=False).encode()).hexdigest()
+
+def same_bytes(a, b):
+    """Чи однакові файли a і b (b може не існувати; a - OSError, якщо його немає)"""
+    st = os.stat(a)
+    try:
+        if os.path.samefile(a, b):
+            return True
+        if os.path.getsize(b) != st.st_size:
+            return False
+    except OSError:
+        return False
+    with open(a, 'rb') as fa, open(b, 'rb') as fb:
+        return fa.read() == fb.read()
+
+class PNGCache:
+    """<dir>/<ключ[:2]>/<ключ>.png; статистика hits/misses/stored/evicted"""
+
+    def __init__(self, directory=PNG_CACHE_DIR, max_bytes=MAX_BYTES, max_age_days=MAX_AGE_DAYS, link=True):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.max_age = max_age_days * 86400
+        self.link = link
+        self.stats = Counter()
+
+    def path(self, key):
+        return self.directory / key[:2] / f'{key}.png'
+
+    def _place(self, src, dst):
+        """src → dst атомарно: жорстке посилання (якщо можна), інакше копія"""
+        tmp = dst.with_name(f'.{dst.name}.{os.getpid()}.tmp')
+        if self.link:
+            try:
+                os.link(src, tmp)
+                os.replace(tmp, dst)
+                return
+            except OSError:
+                pass
+        shutil.copyfile(src, tmp)
+        os.replace(tmp, dst)
+
+    def fetch(self, key, output_file):
+        """
+        Влучання → 'placed' (файл виходу з кешу) або 'same' (файл виходу вже з тими самими байтами, не
+        переписується); промах → None
+        """
+        path = self.path(key)
+        output_file = Path(output_file)
+        try:
+            if same_bytes(path, output_file):
+                result = 'same'
+            else:
+                self._place(path, output_file)
+                result = 'placed'
+            os.utime(path)
+        except OSError:
+            self.stats['misses'] += 1
+            return None
+        self.stats['hits'] += 1
+        return result
+
+    def store(self, key, output_file):
+        """Щойно згенерований файл → кеш"""
+        path = self.path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._place(Path(output_file), path)
+            self.stats['stored'] += 1
+        except OSError as e:
+            print(f"[WARN] Could not store {output_file} in PNG cache: {e}")
+
+    def entries(self):
+        """[(mtime, розмір, шлях)] від найновіших"""
+        items = []
+        for path in self.directory.glob('*/*.png'):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            items.append((st.st_mtime, st.st_size, path))
+        return sorted(items, reverse=True)
+
+    def evict(self, now=None):
+        """Видаляє записи, старші за max_age, і найдавніше використані понад max_bytes"""
+        now = now or time.time()
+        total = 0
+        for mtime, size, path in self.entries():
+            total += size
+            if now - mtime > self.max_age or total > self.max_bytes:
+                path.unlink(missing_ok=True)
+                self.stats['evicted'] += 1
+                total -= size
+        self.stats['bytes'] = total
+
+    def summary(self):
+        s = self.stats
+        looked = s['hits'] + s['misses']
+        ratio = f"{s['hits'] / looked:.0%}" if looked else '-'
+        return (f"hits: {s['hits']}, misses: {s['misses']} ({ratio}), stored: {s['stored']}, "
+                f"evicted: {s['evicted']}, size: {s['bytes'] / 1024:.0f} KB")
+
+if __name__ == '__main__':
+    p = argparse.ArgumentParser()
+    p.add_argument('--dir', default=str(PNG_CACHE_DIR))
+    p.add_argument('--max-mb', type=float, default=MAX_BYTES / 1024 / 1024)
+    p.add_argument('--max-age-days', type=float, default=MAX_AGE_DAYS)
+    p.add_argument('--evict', action='store_true')
+    args = p.parse_args()
+
+    cache = PNGCache(args.dir, int(args.max_mb * 1024 * 1024), args.max_age_days)
+    if args.evict:
+        cache.evict()
+    items = cache.entries()
+    print(f"[CACHE] {cache.directory}: {len(items)} PNG, {sum(size for _, size, _ in items) / 1024:.0f} KB"
+          + (f", evicted: {cache.stats['evicted']}" if args.evict else ''))
@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""
+Спільне для PNG рендерерів: дані документа, маніфест рендеру (hash/date), розкладка таблиці і легенди, бекенди
+Дані (GPV JSON → Schedule) завантажуються один раз і передаються в усі рендерери (RenderData).
+Малює бекенд (get_backend): mpl - matplotlib (render_mpl.py), raster - NumPy + Pillow (render_raster.py).
+Сам модуль matplotlib не імпортує.
+"""
+import io
+import os
+import json
+import importlib
+import hashlib
+from pathlib import Path
+from datetime import datetime, timezone, timedelta
+from collections import Counter
+
+from gpv_compact import load_gpv
+from schedule_model import Schedule
+from render_cache import PNGCache, PNG_CACHE_DIR, content_key
+from png_encode import png_options, webp_enabled, encode_webp
+
+ORANGE = '#FF8C00'
+WHITE = '#FFFFFF'
+GRAY_HEADER = '#E7E6E6'
+GRAY_LABEL = '#D9D9D9'
+BORDER = '#808080'
+# Етикетка черги
+BADGE_COLOR = '#FFD700'
+
+# Таймзона Київ (UTC+2)
+KYIV_TZ = timezone(timedelta(hours=2))
+
+MONTHS_UK = {
+    1: 'січня', 2: 'лютого', 3: 'березня', 4: 'квітня',
+    5: 'травня', 6: 'червня', 7: 'липня', 8: 'серпня',
+    9: 'вересня', 10: 'жовтня', 11: 'листопада', 12: 'грудня'
+}
+
+DEFAULT_REGION_NAME = 'Вінницька область'
+# PNG: 150 dpi, поля 0.13 дюйма навколо вмісту (як bbox_inches='tight')
+DPI = 150
+PAD_INCHES = 0.13
+
+def format_day(date):
+    """datetime → "ДД місяць" (укр.)"""
+    return f'{date.day:02d} {MONTHS_UK[date.month]}'
+
+class RenderData:
+    """GPV документ, підготовлений для всіх рендерерів (завантажується один раз)"""
+    __slots__ = ('doc', 'fact_data', 'schedule', 'sch_names', 'last_updated', 'region_name',
+                 'today_ts', 'tomorrow_ts')
+
+    def __init__(self, doc):
+        self.doc = doc
+        fact = doc.get('fact', {})
+        self.fact_data = fact.get('data', {})
+        self.schedule = Schedule.from_gpv(self.fact_data)
+        self.sch_names = doc.get('preset', {}).get('sch_names', {})
+        self.last_updated = fact.get('update', '')
+        self.region_name = doc.get('regionAffiliation') or DEFAULT_REGION_NAME
+        self.today_ts = str(fact.get('today'))
+        self.tomorrow_ts = str(int(self.today_ts) + 86400)
+
+    @classmethod
+    def load(cls, json_path):
+        """Повний або компактний (*.compact.json) GPV JSON"""
+        return cls(load_gpv(json_path))
+
+    def day_data(self, ts):
+        """Сирі слоти дня {gpv: {...}} (для хешів)"""
+        return self.fact_data.get(str(ts), {})
+
+    def gpv_keys(self, ts):
+        return [k for k in self.schedule.gpv_keys(ts) if k.startswith('GPV')]
+
+    @staticmethod
+    def date(ts):
+        return datetime.fromtimestamp(int(ts), tz=KYIV_TZ)
+
+def data_hash(obj):
+    """SHA256 JSON представлення даних зображення"""
+    return hashlib.sha256(json.dumps(obj, sort_keys=True, ensure_ascii=False).encode()).hexdigest()
+
+# === Маніфест рендеру: один <out>/render-manifest.json на папку виходу ===
+
+MANIFEST_NAME = 'render-manifest.json'
+MANIFEST_VERSION = 1
+LEGACY_HASH_DIR = 'hash'
+
+def file_hash(path):
+    """SHA256 байтів файлу (None - файлу немає)"""
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+class RenderManifest:
+    """
+    Стан зображень папки: {stem: {data_hash, date, png_sha256, rendered_at}}.
+    Читається один раз, змінюється в пам'яті, записується атомарно (tmp + rename) в commit() наприкінці
+    прогону: якщо рендер обірветься, маніфест лишиться попереднім і зображення перегенеруються.
+    Старі hash/<stem>.hash і hash/<stem>.date імпортуються при першому завантаженні і видаляються після commit().
+    """
+
+    def __init__(self, out_p):
+        self.out_p = Path(out_p)
+        self.path = self.out_p / MANIFEST_NAME
+        self.artifacts = {}
+        self.legacy = []
+        self.dirty = False
+        self.load()
+
+    def load(self):
+        if self.path.exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    raw = json.load(f)
+                if raw.get('version') == MANIFEST_VERSION:
+                    self.artifacts = raw.get('artifacts', {})
+                return
+            except Exception as e:
+                print(f"[WARN] Could not read render manifest {self.path}: {e}")
+        self.migrate()
+
+    def migrate(self):
+        """hash/*.hash + *.date → записи маніфесту"""
+        legacy_dir = self.out_p / LEGACY_HASH_DIR
+        for hash_file in sorted(legacy_dir.glob('*.hash')):
+            date_file = hash_file.with_suffix('.date')
+            try:
+                entry = {'data_hash': hash_file.read_text(encoding='utf-8').strip()}
+                if date_file.exists():
+                    entry['date'] = date_file.read_text(encoding='utf-8').strip()
+            except Exception as e:
+                print(f"[WARN] Could not read legacy hash file {hash_file}: {e}")
+                continue
+            self.artifacts[hash_file.stem] = entry
+            self.legacy += [hash_file, date_file]
+            self.dirty = True
+        if self.legacy:
+            print(f"[MIGRATE] {legacy_dir}: {len(self.artifacts)} artifacts → {self.path.name}")
+
+    def get(self, stem):
+        return self.artifacts.get(stem, {})
+
+    def record(self, stem, new_hash, date_code, output_file):
+        self.artifacts[stem] = {
+            'data_hash': new_hash,
+            'date': date_code,
+            'png_sha256': file_hash(output_file),
+            'rendered_at': datetime.now(KYIV_TZ).isoformat(timespec='seconds'),
+        }
+        self.dirty = True
+
+    def adopt(self, stem, output_file):
+        """SHA256 наявного PNG у запис без нього (після міграції)"""
+        self.artifacts[stem]['png_sha256'] = file_hash(output_file)
+        self.dirty = True
+
+    def commit(self):
+        """Атомарний запис (тільки якщо були зміни); після нього - видалення старих hash/ файлів"""
+        if not self.dirty:
+            return False
+        self.out_p.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'version': MANIFEST_VERSION, 'artifacts': dict(sorted(self.artifacts.items()))},
+                      f, ensure_ascii=False, indent=1)
+        os.replace(tmp, self.path)
+        self.dirty = False
+        for path in self.legacy:
+            path.unlink(missing_ok=True)
+        if self.legacy:
+            try:
+                (self.out_p / LEGACY_HASH_DIR).rmdir()
+            except OSError:
+                pass
+            self.legacy = []
+        return True
+
+_MANIFESTS = {}
+
+def manifest_for(out_p):
+    """Маніфест папки (один об'єкт на процес)"""
+    key = Path(out_p).resolve()
+    if key not in _MANIFESTS:
+        _MANIFESTS[key] = RenderManifest(out_p)
+    return _MANIFESTS[key]
+
+def commit_manifests():
+    """Записати всі змінені маніфести (кінець прогону)"""
+    for manifest in _MANIFESTS.values():
+        manifest.commit()
+
+def needs_render(output_file, manifest, stem, new_hash, date_code):
+    """
+    Регенерувати, якщо файлу немає, хеш даних змінився, настав новий день
+    або PNG на диску не той, що записаний у маніфесті
+    """
+    name = output_file.name
+    prev = manifest.get(stem)
+    prev_date = prev.get('date')
+    if not output_file.exists():
+        print(f"[REGEN] {name} (file not found)")
+    elif new_hash != prev.get('data_hash'):
+        print(f"[REGEN] {name} (hash changed)")
+    elif prev_date != date_code:
+        print(f"[REGEN] {name} (date changed: {prev_date} → {date_code})")
+    elif prev.get('png_sha256') and prev['png_sha256'] != file_hash(output_file):
+        print(f"[REGEN] {name} (output differs from manifest)")
+    else:
+        print(f"[SKIP] {name} (no changes)")
+        if not prev.get('png_sha256'):
+            manifest.adopt(stem, output_file)
+        return False
+    return True
+
+def mark_rendered(manifest, stem, new_hash, date_code, output_file):
+    manifest.record(stem, new_hash, date_code, output_file)
+
+# === Розкладка (спільна для бекендів) ===
+
+# Змінювати при будь-якій зміні вигляду зображень: інвалідує шаблони raster і кеш PNG
+LAYOUT_VERSION = 1
+
+HOURS_STACKED = [f'{i:02d}\n-\n{i+1:02d}' for i in range(24)]
+HOURS_INLINE = [f'{i:02d}-{i+1:02d}' for i in range(24)]
+
+# Таблиця в одиницях осі: лейбл 2 + 24 клітинки по 1; рядок 0.5, заголовок 1.0 / 1.2
+CELL_W = 1.0
+CELL_H = 0.5
+LABEL_W = 2.0
+QUEUE_HEADER_H = 1.0
+OVERVIEW_HEADER_H = 1.2
+QUEUE_FIGSIZE = (20, 3.5)
+# Частки фігури осей таблиці (subplot params matplotlib за замовчуванням) - для бекендів без matplotlib
+AXES_LEFT, AXES_RIGHT, AXES_BOTTOM, AXES_TOP = 0.125, 0.9, 0.11, 0.88
+
+# Елементи легенди: (зсув від центру в spacing, ліва половина, права половина, підпис)
+LEGEND_ITEMS = [
+    (-1.8, WHITE, WHITE, 'Світло є'),
+    (-0.6, ORANGE, ORANGE, 'Світла нема'),
+    (0.6, WHITE, ORANGE, 'Світла нема\nдругі 30 хв.'),
+    (1.8, ORANGE, WHITE, 'Світла нема\nперші 30 хв.'),
+]
+
+def overview_figsize(n_rows):
+    return (20, 1.5 + (n_rows * 0.5))
+
+def queue_title(data):
+    return f'Графік відключень для {data.region_name}'
+
+def overview_title(data, ts):
+    return f'Графік відключень для {data.region_name} на {format_day(data.date(ts))}'
+
+# === Бекенди: модуль з VERSION, save_queue(data, gpv_key, output_file) і save_overview(data, ts, gpv_keys, output_file) ===
+
+BACKENDS = {
+    'mpl': ('render_mpl', 'matplotlib'),
+    'raster': ('render_raster', 'numpy pillow'),
+}
+DEFAULT_BACKEND = 'mpl'
+
+def get_backend(name=DEFAULT_BACKEND):
+    """Модуль бекенду (імпортується при першому виклику; matplotlib - тільки для mpl)"""
+    module, requirements = BACKENDS[name]
+    try:
+        return importlib.import_module(module)
+    except ImportError as e:
+        raise ImportError(f"pip install {requirements} ({e})") from e
+
+# === Кеш PNG за вмістом (render_cache.py) ===
+
+_png_cache = None
+
+def use_png_cache(directory=PNG_CACHE_DIR, **options):
+    """Увімкнути кеш PNG у directory (None - вимкнути). Повертає PNGCache або None"""
+    global _png_cache
+    _png_cache = PNGCache(directory, **options) if directory else None
+    return _png_cache
+
+def png_cache():
+    return _png_cache
+
+def queue_payload(data, gpv_key):
+    """Усе видиме на зображенні черги"""
+    days = (data.today_ts, data.tomorrow_ts)
+    return {'kind': 'queue', 'rows': [list(map(int, data.schedule.row(ts, gpv_key))) for ts in days],
+            'labels': [format_day(data.date(ts)) for ts in days], 'name': data.sch_names.get(gpv_key, gpv_key),
+            'title': queue_title(data), 'footer': data.last_updated}
+
+def overview_payload(data, ts, gpv_keys):
+    """Усе видиме на таблиці усіх черг"""
+    return {'kind': 'overview', 'rows': [list(map(int, data.schedule.row(ts, k))) for k in gpv_keys],
+            'names': [data.sch_names.get(k, k) for k in gpv_keys], 'title': overview_title(data, ts),
+            'footer': data.last_updated}
+
+# === Запис PNG: тільки якщо байти змінилися ===
+
+# written - файл записано; identical - новий PNG байт-у-байт як наявний, запис пропущено
+# (обнуляється на початку render_all / render_queues)
+OUTPUT_STATS = Counter()
+
+def encode_png(save, *args):
+    """save(*args, файл) у пам'ять → байти PNG (бекенди кодують детерміновано: без часу і версій)"""
+    buf = io.BytesIO()
+    save(*args, buf)
+    return buf.getvalue()
+
+def write_if_changed(output_file, content):
+    """Байти → файл (tmp + rename), якщо вони відрізняються від наявного файлу. True - записано"""
+    try:
+        if output_file.stat().st_size == len(content) and output_file.read_bytes() == content:
+            return False
+    except OSError:
+        pass
+    # rename, а не запис поверх: старий файл може бути жорстким посиланням на запис кешу PNG
+    tmp = output_file.with_name(f'.{output_file.name}.{os.getpid()}.tmp')
+    tmp.write_bytes(content)
+    os.replace(tmp, output_file)
+    return True
+
+def write_png(output_file, png):
+    """write_if_changed + [IDENTICAL] і OUTPUT_STATS"""
+    if not write_if_changed(output_file, png):
+        print(f"[IDENTICAL] {output_file.name} (same bytes, not written)")
+        OUTPUT_STATS['identical'] += 1
+        return False
+    OUTPUT_STATS['written'] += 1
+    return True
+
+def write_webp(output_file):
+    """WebP поруч з готовим PNG (png_encode.use_png_mode(webp=True))"""
+    write_if_changed(output_file.with_suffix('.webp'), encode_webp(output_file.read_bytes()))
+
+def produce(output_file, backend, payload, encode):
+    """
+    Файл із кешу PNG за вмістом або encode() → байти PNG (+ збереження в кеш), і WebP поруч, якщо увімкнено.
+    → (кеш: 'hit' / 'miss' / None - вимкнено, записано: True / False - байти ті самі, що в наявному файлі)
+    """
+    cached, written = _produce_png(output_file, backend, payload, encode)
+    if webp_enabled():
+        write_webp(output_file)
+    return cached, written
+
+def _produce_png(output_file, backend, payload, encode):
+    cache = _png_cache
+    if cache is None:
+        return None, write_png(output_file, encode())
+    key = content_key([LAYOUT_VERSION, get_backend(backend).VERSION, png_options(), payload])
+    fetched = cache.fetch(key, output_file)
+    if fetched == 'same':
+        print(f"[IDENTICAL] {output_file.name} (same content rendered before, not written)")
+        OUTPUT_STATS['identical'] += 1
+        return 'hit', False
+    if fetched:
+        print(f"[CACHE] {output_file.name} (same content rendered before)")
+        OUTPUT_STATS['written'] += 1
+        return 'hit', True
+    written = write_png(output_file, encode())
+    cache.store(key, output_file)
+    return 'miss', written
+
+def stats_line(stats):
+    """[STATS] рядок рендерерів: перевірено / згенеровано / пропущено + записано / ті самі байти"""
+    return (f"[STATS] Checked: {stats['checked']}, Generated: {stats['generated']}, Skipped: {stats['skipped']}, "
+            f"Written: {OUTPUT_STATS['written']}, Identical: {OUTPUT_STATS['identical']}")
+
+def render_overview(data, ts, out_p, stem, backend=DEFAULT_BACKEND):
+    """
+    Таблиця усіх черг на день ts → out_p/<stem>.png, тільки якщо змінилися дані або дата.
+    True - якщо зображення згенеровано.
+    """
+    manifest = manifest_for(out_p)
+    output_file = out_p / f'{stem}.png'
+    new_hash = data_hash(data.day_data(ts))
+    date_code = data.date(ts).strftime('%Y-%m-%d')
+    if not needs_render(output_file, manifest, stem, new_hash, date_code):
+        return False
+
+    gpv_keys = data.gpv_keys(ts)
+    if not gpv_keys:
+        print(f"[SKIP] {output_file.name} (No GPV schedules found)")
+        return False
+
+    print(f"[GENERATE] {output_file.name} for {data.date(ts).strftime('%d.%m.%Y')}")
+    produce(output_file, backend, overview_payload(data, ts, gpv_keys),
+            lambda: encode_png(get_backend(backend).save_overview, data, ts, gpv_keys))
+    print(f"[OK] {output_file}")
+    mark_rendered(manifest, stem, new_hash, date_code, output_file)
+    return True
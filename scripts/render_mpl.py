@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Бекенд рендеру matplotlib (за замовчуванням): Figure + Agg canvas, без pyplot
+Фігури кешуються за розміром і перевикористовуються між зображеннями (get_figure),
+сітка таблиці - кілька PolyCollection на все зображення (draw_table).
+"""
+import io
+
+import matplotlib
+matplotlib.use('Agg')
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.patches import Rectangle
+from matplotlib.collections import PolyCollection
+import numpy as np
+from PIL import Image
+
+from slot_mask import FIRST, SECOND, NO
+from png_encode import png_mode, save_rgb
+from render_common import (ORANGE, WHITE, GRAY_HEADER, GRAY_LABEL, BORDER, BADGE_COLOR, DPI, PAD_INCHES,
+                           LEGEND_ITEMS, HOURS_STACKED, HOURS_INLINE, CELL_W, CELL_H, LABEL_W, QUEUE_FIGSIZE,
+                           QUEUE_HEADER_H, OVERVIEW_HEADER_H, overview_figsize, format_day, queue_title,
+                           overview_title)
+
+VERSION = f'mpl/{matplotlib.__version__}'
+# Детерміновані байти: без Software (версія matplotlib) - однаковий вміст → однаковий файл
+SAVE_KWARGS = dict(format='png', facecolor=WHITE, dpi=DPI, bbox_inches='tight', pad_inches=PAD_INCHES,
+                   metadata={'Software': None})
+
+# === Фігури ===
+
+_FIGURES = {}
+
+def get_figure(figsize):
+    """Очищена фігура потрібного розміру з однією віссю (кешується між зображеннями)"""
+    fig = _FIGURES.get(figsize)
+    if fig is None:
+        fig = Figure(figsize=figsize, dpi=100)
+        FigureCanvasAgg(fig)
+        _FIGURES[figsize] = fig
+    else:
+        fig.clear()
+    fig.patch.set_facecolor(WHITE)
+    ax = fig.add_subplot(111)
+    ax.set_facecolor(WHITE)
+    return fig, ax
+
+def save_figure(fig, output_file):
+    if png_mode() == 'rgb':
+        fig.savefig(output_file, **SAVE_KWARGS)
+        return
+    # palette: пікселі з savefig без стиснення → png_encode
+    buf = io.BytesIO()
+    fig.savefig(buf, pil_kwargs={'compress_level': 0}, **SAVE_KWARGS)
+    save_rgb(np.asarray(Image.open(buf).convert('RGB')), output_file, DPI)
+
+# === Таблиця ===
+
+def _rect_verts(x, y, w, h):
+    """Масиви x, y, w, h → вершини прямокутників (k, 4, 2) для PolyCollection"""
+    x, y, w, h = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (x, y, w, h)))
+    return np.stack([np.stack([x, y], -1), np.stack([x + w, y], -1),
+                     np.stack([x + w, y + h], -1), np.stack([x, y + h], -1)], axis=-2)
+
+def _add_rects(ax, verts, facecolor, edgecolor='none', linewidth=0):
+    if len(verts):
+        ax.add_collection(PolyCollection(verts, facecolors=facecolor, edgecolors=edgecolor,
+                                         linewidths=linewidth))
+
+def draw_table(ax, header_label, hours, row_labels, rows, label_w, cell_w, cell_h, header_h,
+               header_fontsize, label_fontsize, linespacing=None):
+    """
+    Таблиця: рядок заголовків (лейбл + 24 години) і рядки слотів з масиву кодів станів (n × 24).
+    Сітка - 5 колекцій незалежно від кількості клітинок, у тому ж порядку шарів, що й окремі Rectangle:
+    фон із бордюром → помаранчеві заливки (NO - вся клітинка, FIRST/SECOND - половина) → бордюр зверху.
+    """
+    rows = np.asarray(rows, dtype=np.uint8).reshape(-1, 24)
+    n = len(rows)
+    cols = np.arange(24)
+    xs = label_w + cols * cell_w
+    ys = header_h + np.arange(n) * cell_h
+
+    # Заголовки і лейбли рядків
+    _add_rects(ax, _rect_verts(np.r_[0, xs], 0, np.r_[label_w, np.full(24, cell_w)], header_h),
+               GRAY_HEADER, BORDER, 1)
+    _add_rects(ax, _rect_verts(0, ys, label_w, cell_h), GRAY_LABEL, BORDER, 1)
+
+    # Клітинки слотів: білий фон, заливки за станом, бордюр
+    cell_x, cell_y = np.meshgrid(xs, ys)
+    cells = _rect_verts(cell_x.ravel(), cell_y.ravel(), cell_w, cell_h)
+    _add_rects(ax, cells, WHITE, BORDER, 1)
+    codes = rows.ravel()
+    half = (codes == FIRST) | (codes == SECOND)
+    fill = (codes == NO) | half
+    fill_x = cell_x.ravel() + np.where(codes == SECOND, cell_w/2, 0)
+    fill_w = np.where(half, cell_w/2, cell_w)
+    _add_rects(ax, _rect_verts(fill_x[fill], cell_y.ravel()[fill], fill_w[fill], cell_h), ORANGE)
+    _add_rects(ax, cells, 'none', BORDER, 1)
+
+    ax.text(label_w/2, header_h/2, header_label, fontsize=12, ha='center', va='center',
+            fontweight='bold', color='#000000')
+    extra = {'linespacing': linespacing} if linespacing else {}
+    for i in range(24):
+        ax.text(xs[i] + cell_w/2, header_h/2, hours[i], fontsize=header_fontsize, ha='center', va='center',
+                fontweight='bold', color='#000000', **extra)
+    for y, label in zip(ys, row_labels):
+        ax.text(label_w/2, y + cell_h/2, label, fontsize=label_fontsize, ha='center', va='center',
+                fontweight='bold', color='#000000')
+
+def finish_axes(ax, table_width, table_height):
+    ax.set_xlim(0, table_width)
+    ax.set_ylim(0, table_height)
+    ax.invert_yaxis()
+    ax.set_xticks([])
+    ax.set_yticks([])
+    ax.margins(0)
+    for spine in ax.spines.values():
+        spine.set_visible(False)
+
+def _legend_cell(fig, x, y, w, h, left, right):
+    """Клітинка легенди: ліва і права половини своїм кольором + бордюр"""
+    kw = dict(transform=fig.transFigure, clip_on=False)
+    if left == right:
+        fig.patches.append(Rectangle((x - w/2, y - h/2), w, h, linewidth=0.5, edgecolor=BORDER,
+                                     facecolor=left, **kw))
+        return
+    fig.patches.append(Rectangle((x - w/2, y - h/2), w/2, h, linewidth=0, facecolor=left, **kw))
+    fig.patches.append(Rectangle((x, y - h/2), w/2, h, linewidth=0, facecolor=right, **kw))
+    fig.patches.append(Rectangle((x - w/2, y - h/2), w, h, linewidth=0.5, edgecolor=BORDER,
+                                 facecolor='none', **kw))
+
+def draw_legend(fig, table_width, table_height, cell_h):
+    """Легенда з клітинками, пропорційними до таблиці"""
+    legend_y = 0.005  # Низько
+    legend_x_center = 0.35
+    table_fig_width = 0.9 - 0.05  # 0.85
+    cell_w_fig = table_fig_width / table_width
+    cell_h_fig = (0.85 - 0.15) / table_height * cell_h
+    spacing = 0.09
+    for offset, left, right, text in LEGEND_ITEMS:
+        x = legend_x_center + offset * spacing
+        _legend_cell(fig, x, legend_y, cell_w_fig, cell_h_fig, left, right)
+        fig.text(x + cell_w_fig/2 + 0.005, legend_y, text, fontsize=11, va='center')
+
+def draw_footer(fig, last_updated):
+    if last_updated:
+        fig.text(0.8, 0.001, f'Опубліковано {last_updated}', fontsize=11, ha='right', style='italic')
+
+def draw_queue_figure(data, gpv_key):
+    """Окрема черга: сьогодні + завтра (figsize 20 × 3.5)"""
+    header_h = QUEUE_HEADER_H
+    table_width = LABEL_W + 24 * CELL_W  # 26 одиниць
+    table_height = header_h + 2 * CELL_H
+
+    fig, ax = get_figure(QUEUE_FIGSIZE)
+    days = (data.today_ts, data.tomorrow_ts)
+    draw_table(ax, 'Дата', HOURS_STACKED, [format_day(data.date(ts)) for ts in days],
+               [data.schedule.row(ts, gpv_key) for ts in days], LABEL_W, CELL_W, CELL_H, header_h,
+               header_fontsize=11, label_fontsize=12, linespacing=1.5)
+    finish_axes(ax, table_width, table_height)
+
+    fig.text(0.15, 0.97, queue_title(data), fontsize=18, fontweight='bold')
+    # Етикетка черги
+    fig.text(0.85, 0.97, data.sch_names.get(gpv_key, gpv_key), fontsize=18, fontweight='bold',
+             bbox=dict(boxstyle='round,pad=0.5', facecolor=BADGE_COLOR, edgecolor='#000000', linewidth=1.5),
+             ha='right')
+    draw_legend(fig, table_width, table_height, CELL_H)
+    draw_footer(fig, data.last_updated)
+    return fig
+
+def draw_overview_figure(data, ts, gpv_keys):
+    """Усі черги на один день (висота фігури залежить від кількості черг)"""
+    header_h = OVERVIEW_HEADER_H
+    table_width = LABEL_W + 24 * CELL_W
+    table_height = header_h + len(gpv_keys) * CELL_H
+
+    fig, ax = get_figure(overview_figsize(len(gpv_keys)))
+    draw_table(ax, 'Черга', HOURS_INLINE, [data.sch_names.get(k, k) for k in gpv_keys],
+               [data.schedule.row(ts, k) for k in gpv_keys], LABEL_W, CELL_W, CELL_H, header_h,
+               header_fontsize=10, label_fontsize=10)
+    finish_axes(ax, table_width, table_height)
+
+    fig.text(0.15, 0.97, overview_title(data, ts), fontsize=18, fontweight='bold')
+    draw_legend(fig, table_width, table_height, CELL_H)
+    draw_footer(fig, data.last_updated)
+    return fig
+
+# === Інтерфейс бекенду (render_common.get_backend) ===
+
+def save_queue(data, gpv_key, output_file):
+    save_figure(draw_queue_figure(data, gpv_key), output_file)
+
+def save_overview(data, ts, gpv_keys, output_file):
+    save_figure(draw_overview_figure(data, ts, gpv_keys), output_file)
@@ -0,0 +1,453 @@
+#!/usr/bin/env python3
+"""
+Бекенд рендеру raster: NumPy буфер RGB + Pillow для тексту, без matplotlib
+Розкладка - та сама, що в render_mpl (частки фігури, 150 dpi, поля як bbox_inches='tight'),
+тож зображення того ж розміру, що й у matplotlib (бекенди взаємозамінні); ~5% пікселів відрізняються -
+згладжування і субпіксельне положення тексту (Pillow/FreeType замість Agg).
+Клітинки таблиці малюються зрізами масиву одразу для всіх рядків: коди станів (n × 24) →
+маска півгодин (n × 48) → індекс кольору для кожного пікселя. Текст - маски Pillow, кешовані
+за (текст, шрифт, розмір), тож однакові підписи (години, легенда) растеризуються один раз на процес.
+
+    python scripts/render_all.py --json data/Vinnytsiaoblenerho.json --out /tmp/images --backend raster
+"""
+import os
+import json
+import struct
+import hashlib
+import importlib.util
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import PIL
+from PIL import Image, ImageDraw, ImageFont
+
+from slot_mask import FIRST, SECOND, NO
+from png_encode import save_rgb
+from render_common import (ORANGE, WHITE, GRAY_HEADER, GRAY_LABEL, BORDER, BADGE_COLOR, DPI, PAD_INCHES,
+                           LEGEND_ITEMS, HOURS_STACKED, HOURS_INLINE, CELL_W, CELL_H, LABEL_W, QUEUE_FIGSIZE,
+                           QUEUE_HEADER_H, OVERVIEW_HEADER_H, AXES_LEFT, AXES_RIGHT, AXES_BOTTOM, AXES_TOP,
+                           LAYOUT_VERSION, overview_figsize, format_day, queue_title, overview_title)
+
+# /2 - межі тексту за метриками OS/2 (розмір як у matplotlib 3.11), сітка обрізана по таблиці
+VERSION = f'raster/2/{PIL.__version__}'
+PX_PER_PT = DPI / 72
+
+TEMPLATE_DIR = Path('cache') / 'render-templates'
+TEMPLATE_LIMIT = 32
+
+# DejaVu Sans - шрифт matplotlib за замовчуванням; шукаємо в mpl-data (без імпорту matplotlib) і в системі
+FONT_FILES = {
+    'regular': 'DejaVuSans.ttf',
+    'bold': 'DejaVuSans-Bold.ttf',
+    'italic': 'DejaVuSans-Oblique.ttf',
+}
+SYSTEM_FONT_DIRS = [
+    '/usr/share/fonts/truetype/dejavu',
+    '/usr/share/fonts/truetype',
+    '/usr/share/fonts/TTF',
+    '/usr/share/fonts/dejavu',
+]
+
+def _font_dirs():
+    dirs = []
+    spec = importlib.util.find_spec('matplotlib')
+    if spec and spec.submodule_search_locations:
+        dirs += [os.path.join(p, 'mpl-data', 'fonts', 'ttf') for p in spec.submodule_search_locations]
+    return dirs + SYSTEM_FONT_DIRS
+
+@lru_cache(maxsize=None)
+def font_path(style):
+    """Файл шрифту стилю (italic без Oblique → regular)"""
+    for name in (FONT_FILES[style], FONT_FILES['regular']):
+        for d in _font_dirs():
+            path = os.path.join(d, name)
+            if os.path.exists(path):
+                return path
+    raise FileNotFoundError(f"{FONT_FILES[style]} not found (pip install matplotlib або fonts-dejavu)")
+
+@lru_cache(maxsize=None)
+def get_font(style, size_pt):
+    return ImageFont.truetype(font_path(style), size_pt * PX_PER_PT)
+
+@lru_cache(maxsize=None)
+def font_metrics(style):
+    """(ascent, descent, line_gap) з таблиці OS/2 шрифту (sTypo*) у частках кегля - як у matplotlib"""
+    with open(font_path(style), 'rb') as f:
+        data = f.read()
+    tables = {}
+    for i in range(struct.unpack_from('>H', data, 4)[0]):
+        tag, _, offset, _ = struct.unpack_from('>4sIII', data, 12 + 16 * i)
+        tables[tag] = offset
+    units = struct.unpack_from('>H', data, tables[b'head'] + 18)[0]
+    ascent, descent, gap = struct.unpack_from('>hhh', data, tables[b'OS/2'] + 68)
+    return ascent / units, -descent / units, gap / units
+
+@lru_cache(maxsize=1024)
+def text_mask(text, style, size_pt, anchor, linespacing=None):
+    """
+    Растеризований підпис: (маска uint16 0..255, dx, dy, межі) - dx, dy: зсув лівого верхнього кута маски
+    від точки прив'язки; межі (x0, y0, x1, y1) від неї ж - як layout bbox у matplotlib 3.11: висота рядка
+    з метрик OS/2 шрифту, а не з гліфів (діакритика над великими літерами виходить за неї на ~0.3 px).
+    anchor - як у Pillow: l/m/r + m (центр блоку) або s (базова лінія першого рядка).
+    Рядки з кроком ascent + descent + line_gap (linespacing None - 'normal' у matplotlib)
+    або linespacing × (ascent + descent), блок центрується як у matplotlib.
+    """
+    font = get_font(style, size_pt)
+    ascent, descent, gap = (v * font.size for v in font_metrics(style))
+    lines = text.split('\n')
+    if len(lines) == 1:
+        gap = 0
+    step = ascent + descent + gap if linespacing is None else linespacing * (ascent + descent)
+    lead = (step - ascent - descent) / 2
+    height = len(lines) * step
+    block_top = -height / 2 if anchor[1] == 'm' else -(ascent + lead)
+    line_anchor = anchor[0] + 's'
+    placed = []
+    for i, line in enumerate(lines):
+        y = block_top + lead + ascent + i * step
+        x0, y0, x1, y1 = font.getbbox(line, anchor=line_anchor)
+        placed.append((line, y, (x0, y0 + y, x1, y1 + y)))
+    left = int(np.floor(min(b[0] for _, _, b in placed)))
+    top = int(np.floor(min(b[1] for _, _, b in placed)))
+    right = int(np.ceil(max(b[2] for _, _, b in placed)))
+    bottom = int(np.ceil(max(b[3] for _, _, b in placed)))
+    img = Image.new('L', (max(right - left, 1), max(bottom - top, 1)), 0)
+    draw = ImageDraw.Draw(img)
+    for line, y, _ in placed:
+        draw.text((-left, y - top), line, font=font, fill=255, anchor=line_anchor)
+    mask = np.asarray(img, dtype=np.uint16)
+    mask.flags.writeable = False
+    extent = (left, block_top, right, block_top + height)
+    return mask, left, top, extent
+
+def rgb(color):
+    color = color.lstrip('#')
+    return np.array([int(color[i:i + 2], 16) for i in (0, 2, 4)], dtype=np.uint8)
+
+def fill(region, pixels):
+    """Заливка зрізу буфера кольором або рядком пікселів: перший рядок + копія його в решту (швидше за broadcast RGB)"""
+    if region.size:
+        region[0] = pixels
+        region[1:] = region[0]
+
+def _clip(buf, x, y, w, h):
+    """Зрізи буфера і латки для прямокутника (x, y, w, h), обрізаного по краях буфера"""
+    H, W = buf.shape[:2]
+    x0, y0, x1, y1 = max(x, 0), max(y, 0), min(x + w, W), min(y + h, H)
+    if x0 >= x1 or y0 >= y1:
+        return None, None
+    return (slice(y0, y1), slice(x0, x1)), (slice(y0 - y, y1 - y), slice(x0 - x, x1 - x))
+
+class Canvas:
+    """
+    Полотно у пікселях фігури (y вниз). Елементи додаються з межами; render() обрізає
+    до об'єднання меж + PAD_INCHES (як bbox_inches='tight') і малює їх по черзі.
+    Шари: статичний (spec - опис елемента для ключа шаблону) і змінний (клітинки, дати, етикетка, футер).
+    Статичний шар рендериться один раз і береться з кешу шаблонів (render(templates=...)).
+    """
+
+    def __init__(self, figsize):
+        self.width = figsize[0] * DPI
+        self.height = figsize[1] * DPI
+        self.box = [np.inf, np.inf, -np.inf, -np.inf]
+        self.static = []
+        self.specs = []
+        self.dynamic = []
+
+    def fig(self, fx, fy):
+        """Частки фігури (y знизу, як у matplotlib) → пікселі (y вниз)"""
+        return fx * self.width, (1 - fy) * self.height
+
+    def extend(self, x0, y0, x1, y1):
+        b = self.box
+        self.box = [min(b[0], x0), min(b[1], y0), max(b[2], x1), max(b[3], y1)]
+
+    def add(self, painter, box=None, spec=None):
+        """spec (хешований опис) - елемент статичного шару; без spec - змінного"""
+        if box:
+            self.extend(*box)
+        if spec is None:
+            self.dynamic.append(painter)
+        else:
+            self.static.append(painter)
+            self.specs.append(spec)
+
+    def rect(self, x0, y0, x1, y1, color=None, edge=None, edge_px=1, static=True):
+        """Прямокутник із заливкою color (None - без неї) і рамкою edge всередину на edge_px"""
+        def paint(buf, ox, oy):
+            a, b, c, d = (int(round(v)) for v in (x0 - ox, y0 - oy, x1 - ox, y1 - oy))
+            if color:
+                fill(buf[b:d, a:c], rgb(color))
+            if edge:
+                e = rgb(edge)
+                buf[b:b + edge_px, a:c] = e
+                buf[d - edge_px:d, a:c] = e
+                buf[b:d, a:a + edge_px] = e
+                buf[b:d, c - edge_px:c] = e
+        spec = ('rect', round(x0, 3), round(y0, 3), round(x1, 3), round(y1, 3), color, edge, edge_px)
+        self.add(paint, (x0, y0, x1, y1), spec if static else None)
+
+    def text(self, x, y, text, size_pt, style='bold', anchor='mm', linespacing=None, static=True):
+        mask, dx, dy, (ex0, ey0, ex1, ey1) = text_mask(text, style, size_pt, anchor, linespacing)
+        h, w = mask.shape
+        def paint(buf, ox, oy):
+            dst, src = _clip(buf, int(round(x - ox)) + dx, int(round(y - oy)) + dy, w, h)
+            if dst:
+                region = buf[dst].astype(np.uint16)
+                # чорний текст: колір × (1 - альфа)
+                buf[dst] = (region * (255 - mask[src])[..., None] // 255).astype(np.uint8)
+        spec = ('text', round(x, 3), round(y, 3), text, size_pt, style, anchor, linespacing)
+        self.add(paint, (x + ex0, y + ey0, x + ex1, y + ey1), spec if static else None)
+
+    def origin(self):
+        """Лівий верхній кут обрізання у пікселях фігури і розмір зображення"""
+        pad = PAD_INCHES * DPI
+        x0, y0, x1, y1 = self.box
+        return x0 - pad, y0 - pad, int(round(y1 - y0 + 2 * pad)), int(round(x1 - x0 + 2 * pad))
+
+    def paint_static(self):
+        ox, oy, h, w = self.origin()
+        buf = np.empty((h, w, 3), dtype=np.uint8)
+        fill(buf, rgb(WHITE))
+        for paint in self.static:
+            paint(buf, ox, oy)
+        return buf
+
+    def render(self, templates=None):
+        """RGB масив; templates (TemplateCache) - статичний шар з кешу замість малювання"""
+        ox, oy, h, w = self.origin()
+        if templates is None:
+            buf = self.paint_static()
+        else:
+            buf = templates.get(self).copy()
+        for paint in self.dynamic:
+            paint(buf, ox, oy)
+        return buf
+
+# === Кеш шаблонів (статичний шар на диску) ===
+
+class TemplateCache:
+    """
+    Статичні шари зображень: <dir>/<ключ>.npy + копія в пам'яті процесу.
+    Ключ - SHA256 від версії розкладки, шрифтів (файл, розмір), Pillow, меж обрізання і spec усіх
+    статичних елементів: зміна заголовка, регіону, легенди чи шрифту дає новий шаблон, старі
+    витісняються за часом використання (limit файлів).
+    """
+
+    def __init__(self, directory=TEMPLATE_DIR, limit=TEMPLATE_LIMIT):
+        self.directory = Path(directory)
+        self.limit = limit
+        self.memory = {}
+        self.stats = Counter()
+
+    def key(self, canvas):
+        ox, oy, h, w = canvas.origin()
+        fonts = [(FONT_FILES[style], os.path.getsize(font_path(style))) for style in sorted(FONT_FILES)]
+        payload = [LAYOUT_VERSION, PIL.__version__, fonts, [round(ox, 3), round(oy, 3), h, w], canvas.specs]
+        return hashlib.sha256(json.dumps(payload, ensure_ascii=False).encode()).hexdigest()[:32]
+
+    def get(self, canvas):
+        key = self.key(canvas)
+        template = self.memory.get(key)
+        if template is not None:
+            self.stats['memory'] += 1
+            return template
+        path = self.directory / f'{key}.npy'
+        try:
+            template = np.load(path)
+            os.utime(path)
+            self.stats['disk'] += 1
+        except (OSError, ValueError, EOFError):
+            # EOFError - файл іншого процесу ще порожній
+            template = canvas.paint_static()
+            self.save(path, template)
+            self.stats['built'] += 1
+        template.flags.writeable = False
+        self.memory[key] = template
+        return template
+
+    def save(self, path, template):
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            # свій tmp на процес: воркери --jobs можуть одночасно писати той самий шаблон
+            tmp = path.with_name(f'.{path.stem}.{os.getpid()}.tmp')
+            with open(tmp, 'wb') as f:
+                np.save(f, template)
+            os.replace(tmp, path)
+            self.evict()
+        except OSError as e:
+            print(f"[WARN] Could not save template {path}: {e}")
+
+    def evict(self):
+        files = sorted(self.directory.glob('*.npy'), key=lambda p: p.stat().st_mtime, reverse=True)
+        for old in files[self.limit:]:
+            old.unlink(missing_ok=True)
+
+# === Таблиця ===
+
+def _half_hour_off(rows):
+    """Коди станів (n × 24) → маска півгодин без світла (n × 48)"""
+    off = np.empty((len(rows), 48), dtype=bool)
+    off[:, 0::2] = (rows == NO) | (rows == FIRST)
+    off[:, 1::2] = (rows == NO) | (rows == SECOND)
+    return off
+
+def draw_table(canvas, header_label, hours, row_labels, rows, header_h, header_fontsize, label_fontsize,
+               linespacing=None, static_labels=True):
+    """
+    Таблиця в осях фігури. Статичний шар: заголовки, фон лейблів, сітка (і лейбли, якщо static_labels).
+    Змінний: внутрішність клітинок слотів - рядок пікселів на рядок таблиці зі стовпцями сітки.
+    """
+    rows = np.asarray(rows, dtype=np.uint8).reshape(-1, 24)
+    n = len(rows)
+    left, top = canvas.fig(AXES_LEFT, AXES_TOP)
+    right, bottom = canvas.fig(AXES_RIGHT, AXES_BOTTOM)
+    sx = (right - left) / (LABEL_W + 24 * CELL_W)
+    sy = (bottom - top) / (header_h + n * CELL_H)
+    border_px = max(1, int(round(PX_PER_PT)))
+    lo = -(border_px // 2)
+    span = np.arange(lo, lo + border_px)
+
+    def edges(ox, oy):
+        """Межі у пікселях буфера: колонки по півгодини (49), колонки таблиці (26), рядки (n + 2)"""
+        half_x = np.rint(left - ox + (LABEL_W + np.arange(49) * CELL_W / 2) * sx).astype(int)
+        col_x = np.r_[int(round(left - ox)), half_x[0::2]]
+        row_y = np.rint(top - oy + np.r_[0, header_h + np.arange(n + 1) * CELL_H] * sy).astype(int)
+        return half_x, col_x, row_y
+
+    def paint_grid(buf, ox, oy):
+        half_x, col_x, row_y = edges(ox, oy)
+        fill(buf[row_y[0]:row_y[1], col_x[0]:col_x[-1]], rgb(GRAY_HEADER))
+        fill(buf[row_y[1]:row_y[-1], col_x[0]:col_x[1]], rgb(GRAY_LABEL))
+        fill(buf[row_y[1]:row_y[-1], col_x[1]:col_x[-1]], rgb(WHITE))
+        # Сітка: лінії товщиною 1pt по центру меж, обрізані по таблиці (як clip осей у matplotlib:
+        # від зовнішньої рамки лишається внутрішня половина)
+        xs = (col_x[:, None] + span).ravel()
+        ys = (row_y[:, None] + span).ravel()
+        xs = xs[(xs >= col_x[0]) & (xs < col_x[-1])]
+        ys = ys[(ys >= row_y[0]) & (ys < row_y[-1])]
+        buf[row_y[0]:row_y[-1], xs] = rgb(BORDER)
+        buf[ys, col_x[0]:col_x[-1]] = rgb(BORDER)
+
+    def paint_cells(buf, ox, oy):
+        half_x, col_x, row_y = edges(ox, oy)
+        palette = np.stack([rgb(WHITE), rgb(ORANGE)])
+        col_idx = np.repeat(np.arange(48), np.diff(half_x))
+        lines = palette[_half_hour_off(rows)[:, col_idx].view(np.uint8)]
+        # вертикальні лінії сітки лишаються як у шаблоні
+        lines[:, (col_x[1:-1, None] + span).ravel() - half_x[0]] = rgb(BORDER)
+        for r in range(n):
+            fill(buf[row_y[r + 1] + lo + border_px:row_y[r + 2] + lo, half_x[0]:half_x[-1]], lines[r])
+
+    canvas.add(paint_grid, (left, top, right, bottom),
+               ('table', round(left, 3), round(top, 3), round(right, 3), round(bottom, 3), header_h, n))
+    canvas.add(paint_cells)
+
+    header_y = top + header_h / 2 * sy
+    canvas.text(left + LABEL_W / 2 * sx, header_y, header_label, 12)
+    for i, label in enumerate(hours):
+        canvas.text(left + (LABEL_W + (i + 0.5) * CELL_W) * sx, header_y, label, header_fontsize,
+                    linespacing=linespacing)
+    for r, label in enumerate(row_labels):
+        canvas.text(left + LABEL_W / 2 * sx, top + (header_h + (r + 0.5) * CELL_H) * sy, label, label_fontsize,
+                    static=static_labels)
+    return header_h + n * CELL_H
+
+# === Підписи ===
+
+def draw_legend(canvas, table_width, table_height, cell_h):
+    """Легенда: ті самі частки фігури, що й у render_mpl.draw_legend"""
+    cell_w = (0.9 - 0.05) / table_width * canvas.width
+    cell_h = (0.85 - 0.15) / table_height * cell_h * canvas.height
+    edge_px = max(1, int(round(0.5 * PX_PER_PT)))
+    for offset, left_color, right_color, text in LEGEND_ITEMS:
+        x, y = canvas.fig(0.35 + offset * 0.09, 0.005)
+        x0, y0, x1, y1 = x - cell_w / 2, y - cell_h / 2, x + cell_w / 2, y + cell_h / 2
+        canvas.rect(x0, y0, x, y1, left_color)
+        canvas.rect(x, y0, x1, y1, right_color)
+        canvas.rect(x0, y0, x1, y1, edge=BORDER, edge_px=edge_px)
+        canvas.text(x + cell_w / 2 + 0.005 * canvas.width, y, text, 11, style='regular', anchor='lm')
+
+def draw_footer(canvas, last_updated):
+    if last_updated:
+        x, y = canvas.fig(0.8, 0.001)
+        canvas.text(x, y, f'Опубліковано {last_updated}', 11, style='italic', anchor='rs', static=False)
+
+@lru_cache(maxsize=64)
+def badge_image(text, size_pt=18):
+    """
+    Етикетка черги: текст у жовтому заокругленому прямокутнику (boxstyle round, pad 0.5 em, рамка 1.5pt).
+    → (RGB масив, dx, dy від правого кінця базової лінії тексту)
+    """
+    mask, dx, dy, _ = text_mask(text, 'bold', size_pt, 'rs')
+    pad = int(round(0.5 * size_pt * PX_PER_PT))
+    edge = max(1, int(round(1.5 * PX_PER_PT)))
+    h, w = mask.shape
+    img = Image.new('RGB', (w + 2 * pad, h + 2 * pad), WHITE)
+    ImageDraw.Draw(img).rounded_rectangle((0, 0, w + 2 * pad - 1, h + 2 * pad - 1), radius=pad,
+                                          fill=BADGE_COLOR, outline='#000000', width=edge)
+    patch = np.array(img, dtype=np.uint16)
+    patch[pad:pad + h, pad:pad + w] = patch[pad:pad + h, pad:pad + w] * (255 - mask)[..., None] // 255
+    patch = patch.astype(np.uint8)
+    patch.flags.writeable = False
+    return patch, dx - pad, dy - pad
+
+def draw_badge(canvas, text):
+    """Етикетка праворуч угорі; в межі обрізання входить тільки текст (як у matplotlib)"""
+    x, y = canvas.fig(0.85, 0.97)
+    patch, dx, dy = badge_image(text)
+    ex0, ey0, ex1, ey1 = text_mask(text, 'bold', 18, 'rs')[3]
+    def paint(buf, ox, oy):
+        dst, src = _clip(buf, int(round(x - ox)) + dx, int(round(y - oy)) + dy, patch.shape[1], patch.shape[0])
+        if dst:
+            buf[dst] = patch[src]
+    canvas.add(paint, (x + ex0, y + ey0, x + ex1, y + ey1))
+
+# === Зображення ===
+
+# Кеш шаблонів процесу; None - малювати статичний шар щоразу (use_templates)
+_templates = TemplateCache()
+
+def use_templates(directory=TEMPLATE_DIR):
+    """Увімкнути кеш шаблонів у directory (None - вимкнути). Повертає TemplateCache або None"""
+    global _templates
+    _templates = TemplateCache(directory) if directory else None
+    return _templates
+
+def draw_queue_image(data, gpv_key):
+    """Окрема черга: сьогодні + завтра → RGB масив (змінні: клітинки, дати, етикетка, футер)"""
+    canvas = Canvas(QUEUE_FIGSIZE)
+    days = (data.today_ts, data.tomorrow_ts)
+    table_height = draw_table(canvas, 'Дата', HOURS_STACKED, [format_day(data.date(ts)) for ts in days],
+                              [data.schedule.row(ts, gpv_key) for ts in days], QUEUE_HEADER_H,
+                              header_fontsize=11, label_fontsize=12, linespacing=1.5, static_labels=False)
+    canvas.text(*canvas.fig(0.15, 0.97), queue_title(data), 18, anchor='ls')
+    draw_badge(canvas, data.sch_names.get(gpv_key, gpv_key))
+    draw_legend(canvas, LABEL_W + 24 * CELL_W, table_height, CELL_H)
+    draw_footer(canvas, data.last_updated)
+    return canvas.render(_templates)
+
+def draw_overview_image(data, ts, gpv_keys):
+    """Усі черги на один день → RGB масив (змінні: клітинки, заголовок з датою, футер)"""
+    canvas = Canvas(overview_figsize(len(gpv_keys)))
+    table_height = draw_table(canvas, 'Черга', HOURS_INLINE, [data.sch_names.get(k, k) for k in gpv_keys],
+                              [data.schedule.row(ts, k) for k in gpv_keys], OVERVIEW_HEADER_H,
+                              header_fontsize=10, label_fontsize=10)
+    canvas.text(*canvas.fig(0.15, 0.97), overview_title(data, ts), 18, anchor='ls', static=False)
+    draw_legend(canvas, LABEL_W + 24 * CELL_W, table_height, CELL_H)
+    draw_footer(canvas, data.last_updated)
+    return canvas.render(_templates)
+
+def save_image(buf, output_file):
+    """RGB масив → PNG у режимі png_encode (rgb / palette)"""
+    save_rgb(buf, output_file, DPI)
+
+# === Інтерфейс бекенду (render_common.get_backend) ===
+
+def save_queue(data, gpv_key, output_file):
+    save_image(draw_queue_image(data, gpv_key), output_file)
+
+def save_overview(data, ts, gpv_keys, output_file):
+    save_image(draw_overview_image(data, ts, gpv_keys), output_file)
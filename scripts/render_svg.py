@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+SVG без matplotlib: розмітка напряму з масиву станів слотів (окрема черга - 2 дні, усі черги - на день)
+Розкладка - ті ж частки фігури, що й у render_mpl / render_raster; одиниці viewBox - пункти (1/72").
+Таблиця - у своїх одиницях (клітинка 1 × 0.5, translate + scale): білий фон, сітка одним <path>, кожен слот
+без світла - <use> одного з 3 символів у <defs> (first / second / no). Статична частина (defs, фон,
+заголовки, сітка, легенда) будується один раз на розмір таблиці (lru_cache) як string.Template, на зображення
+підставляються тільки клітинки, підписи, заголовок і футер: ~0.05-0.2 мс, кілька KB.
+
+    python scripts/render_svg.py --json data/Vinnytsiaoblenerho.json --out images/Vinnytsiaoblenerho
+    python scripts/render_all.py --json ... --out ... --svg   (SVG поруч з PNG)
+"""
+import time
+import argparse
+from string import Template
+from functools import lru_cache
+from html import escape
+from pathlib import Path
+
+from slot_mask import YES, FIRST, SECOND, NO
+from render_common import (ORANGE, WHITE, GRAY_HEADER, GRAY_LABEL, BORDER, BADGE_COLOR, PAD_INCHES, LEGEND_ITEMS,
+                           HOURS_STACKED, HOURS_INLINE, CELL_W, CELL_H, LABEL_W, QUEUE_FIGSIZE, QUEUE_HEADER_H,
+                           OVERVIEW_HEADER_H, AXES_LEFT, AXES_RIGHT, AXES_BOTTOM, AXES_TOP, LAYOUT_VERSION,
+                           RenderData, overview_figsize, format_day, queue_title, overview_title, write_if_changed)
+from render_png import format_gpv_filename
+
+VERSION = f'svg/{LAYOUT_VERSION}'
+FONT_FAMILY = 'DejaVu Sans, Verdana, Arial, sans-serif'
+PAD = PAD_INCHES * 72
+# Метрики DejaVu Sans (частки em): висота над / під базовою лінією, ширини для рамки етикетки черги (жирний)
+ASCENT, DESCENT = 0.76, 0.24
+BOLD_WIDTHS = {' ': 0.35, '.': 0.38, '-': 0.42}
+BOLD_DIGIT, BOLD_OTHER = 0.7, 0.72
+
+def num(v):
+    """Число для атрибута: 1 знак після коми без зайвого нуля"""
+    return f'{v:.1f}'.removesuffix('.0')
+
+def bold_width(text, size):
+    """Оцінка ширини жирного тексту в пунктах (без шрифтів - тільки для рамки етикетки)"""
+    return size * sum(BOLD_WIDTHS.get(ch, BOLD_DIGIT if ch.isdigit() else BOLD_OTHER) for ch in text)
+
+def text(x, y, label, size=None, anchor=None, baseline=None, weight=None, style=None, linespacing=1.2):
+    """
+    <text> (атрибути, яких немає, - від батьківської <g>); багаторядковий - <tspan> з кроком linespacing,
+    блок центрований по y
+    """
+    attrs = f'x="{num(x)}" y="{num(y)}"'
+    for name, value in (('font-size', size), ('text-anchor', anchor), ('dominant-baseline', baseline),
+                        ('font-weight', weight), ('font-style', style)):
+        if value:
+            attrs += f' {name}="{value}"'
+    lines = label.split('\n')
+    if len(lines) == 1:
+        return f'<text {attrs}>{escape(label)}</text>'
+    first = -(len(lines) - 1) / 2 * linespacing
+    spans = ''.join(f'<tspan x="{num(x)}" dy="{first if i == 0 else linespacing:g}em">{escape(line)}</tspan>'
+                    for i, line in enumerate(lines))
+    return f'<text {attrs}>{spans}</text>'
+
+# Клітинки в одиницях таблиці (клітинка CELL_W × CELL_H): заливки станів без світла; "yes" - білий фон таблиці
+CELL_DEFS = (f'<rect id="s{FIRST}" width="{CELL_W / 2:g}" height="{CELL_H:g}" fill="{ORANGE}"/>'
+             f'<rect id="s{SECOND}" x="{CELL_W / 2:g}" width="{CELL_W / 2:g}" height="{CELL_H:g}" fill="{ORANGE}"/>'
+             f'<rect id="s{NO}" width="{CELL_W:g}" height="{CELL_H:g}" fill="{ORANGE}"/>')
+
+class Layout:
+    """Геометрія зображення в пунктах: фігура figsize, таблиця n рядків з заголовком header_h"""
+
+    def __init__(self, figsize, header_h, n):
+        self.width, self.height = figsize[0] * 72, figsize[1] * 72
+        self.left, self.top = self.fig(AXES_LEFT, AXES_TOP)
+        self.right, self.bottom = self.fig(AXES_RIGHT, AXES_BOTTOM)
+        self.table_height = header_h + n * CELL_H
+        self.sx = (self.right - self.left) / (LABEL_W + 24 * CELL_W)
+        self.sy = (self.bottom - self.top) / self.table_height
+        self.header_h, self.n = header_h, n
+
+    def fig(self, fx, fy):
+        """Частки фігури (0,0 - низ ліворуч) → пункти (y вниз)"""
+        return fx * self.width, (1 - fy) * self.height
+
+    def x(self, u):
+        return self.left + u * self.sx
+
+    def y(self, u):
+        return self.top + u * self.sy
+
+def legend(layout):
+    """Легенда: ті самі частки фігури, що й у render_mpl.draw_legend. → (розмітка, нижній край)"""
+    cell_w = (0.9 - 0.05) / (LABEL_W + 24 * CELL_W) * layout.width
+    cell_h = (0.85 - 0.15) / layout.table_height * CELL_H * layout.height
+    parts, bottom = [], 0
+    for offset, left, right, label in LEGEND_ITEMS:
+        x, y = layout.fig(0.35 + offset * 0.09, 0.005)
+        x0, y0 = x - cell_w / 2, y - cell_h / 2
+        size = f'y="{num(y0)}" height="{num(cell_h)}"'
+        if left != right:
+            parts.append(f'<rect x="{num(x0)}" {size} width="{num(cell_w / 2)}" fill="{left}"/>'
+                         f'<rect x="{num(x)}" {size} width="{num(cell_w / 2)}" fill="{right}"/>')
+        face = left if left == right else 'none'
+        parts.append(f'<rect x="{num(x0)}" {size} width="{num(cell_w)}" fill="{face}" stroke="{BORDER}" '
+                     f'stroke-width="0.5"/>')
+        parts.append(text(x + cell_w / 2 + 0.005 * layout.width, y, label))
+        bottom = max(bottom, y + cell_h / 2, y + (label.count('\n') + 1) * 1.2 * 11 / 2)
+    return f'<g font-size="11" dominant-baseline="central">{"".join(parts)}</g>', bottom
+
+@lru_cache(maxsize=16)
+def page(figsize, header_h, n, header_label, hours, header_fontsize, label_fontsize, linespacing, badge):
+    """
+    Шаблон зображення (string.Template) для таблиці n рядків; змінні: $cells, $labels, $title, $badge,
+    $footer. → (Template, Layout)
+    """
+    layout = Layout(figsize, header_h, n)
+    table_w = LABEL_W + 24 * CELL_W
+    # Таблиця в своїх одиницях: translate + scale, лінії сітки 1pt незалежно від масштабу
+    grid = ''.join(f'M{x:g} 0V{layout.table_height:g}' for x in [0, LABEL_W] + [LABEL_W + i * CELL_W
+                                                                               for i in range(1, 25)])
+    grid += ''.join(f'M0 {y:g}H{table_w:g}' for y in [0] + [header_h + r * CELL_H for r in range(n + 1)])
+    table = (f'<g transform="translate({num(layout.left)} {num(layout.top)}) scale({layout.sx:.3f} {layout.sy:.3f})">'
+             f'<rect width="{table_w:g}" height="{header_h:g}" fill="{GRAY_HEADER}"/>'
+             f'<rect y="{header_h:g}" width="{LABEL_W:g}" height="{n * CELL_H:g}" fill="{GRAY_LABEL}"/>'
+             f'<rect x="{LABEL_W:g}" y="{header_h:g}" width="{24 * CELL_W:g}" height="{n * CELL_H:g}" fill="{WHITE}"/>'
+             f'$cells<path d="{grid}" stroke="{BORDER}" vector-effect="non-scaling-stroke"/></g>')
+    header_y = layout.y(header_h / 2)
+    headers = ''.join(text(layout.x(LABEL_W + (i + 0.5) * CELL_W), header_y, label, linespacing=linespacing)
+                      for i, label in enumerate(hours))
+    headers = (f'<g font-weight="bold" text-anchor="middle" dominant-baseline="central">'
+               f'{text(layout.x(LABEL_W / 2), header_y, header_label, 12)}'
+               f'<g font-size="{header_fontsize}">{headers}</g>'
+               f'<g font-size="{label_fontsize}">$labels</g></g>')
+
+    legend_svg, legend_bottom = legend(layout)
+    title_x, title_y = layout.fig(0.15, 0.97)
+    top = title_y - ASCENT * 18 - (0.5 * 18 + 1.5 if badge else 0)
+    bottom = max(legend_bottom, layout.fig(0.8, 0.001)[1] + DESCENT * 11)
+    view = (num(layout.left - PAD), num(top - PAD), num(layout.right - layout.left + 2 * PAD),
+            num(bottom - top + 2 * PAD))
+    template = Template(
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="{" ".join(view)}" width="{view[2]}pt" '
+        f'height="{view[3]}pt" font-family="{FONT_FAMILY}">'
+        f'<defs>{CELL_DEFS}</defs>'
+        f'<rect x="{view[0]}" y="{view[1]}" width="100%" height="100%" fill="{WHITE}"/>'
+        f'{table}{headers}'
+        f'{text(title_x, title_y, "$title", 18, weight="bold")}'
+        f'$badge{legend_svg}$footer</svg>')
+    return template, layout
+
+def render(figsize, header_h, header_label, hours, header_fontsize, label_fontsize, linespacing,
+           row_labels, rows, title, badge, footer):
+    template, layout = page(figsize, header_h, len(rows), header_label, tuple(hours), header_fontsize,
+                            label_fontsize, linespacing, bool(badge))
+    cells = ''.join(f'<use href="#s{code}" x="{LABEL_W + i * CELL_W:g}" y="{header_h + r * CELL_H:g}"/>'
+                    for r, row in enumerate(rows) for i, code in enumerate(row.tolist()) if code != YES)
+    labels = ''.join(text(layout.x(LABEL_W / 2), layout.y(header_h + (r + 0.5) * CELL_H), label)
+                     for r, label in enumerate(row_labels))
+    return template.substitute(cells=cells, labels=labels, title=escape(title),
+                               badge=badge_svg(layout, badge) if badge else '', footer=footer_svg(layout, footer))
+
+def badge_svg(layout, label, size=18):
+    """Етикетка черги праворуч угорі: жовтий заокруглений прямокутник (pad 0.5 em, рамка 1.5pt)"""
+    right, baseline = layout.fig(0.85, 0.97)
+    pad, w = 0.5 * size, bold_width(label, size)
+    return (f'<rect x="{num(right - w - pad)}" y="{num(baseline - ASCENT * size - pad)}" width="{num(w + 2 * pad)}" '
+            f'height="{num(size + 2 * pad)}" rx="{num(pad)}" fill="{BADGE_COLOR}" stroke="#000000" '
+            f'stroke-width="1.5"/>'
+            + text(right - w / 2, baseline, label, size, anchor='middle', weight='bold'))
+
+def footer_svg(layout, last_updated):
+    if not last_updated:
+        return ''
+    x, y = layout.fig(0.8, 0.001)
+    return text(x, y, f'Опубліковано {last_updated}', 11, anchor='end', style='italic')
+
+def queue_svg(data, gpv_key):
+    """Окрема черга: сьогодні + завтра → SVG (str)"""
+    days = (data.today_ts, data.tomorrow_ts)
+    return render(QUEUE_FIGSIZE, QUEUE_HEADER_H, 'Дата', HOURS_STACKED, 11, 12, 1.5,
+                  [format_day(data.date(ts)) for ts in days], [data.schedule.row(ts, gpv_key) for ts in days],
+                  queue_title(data), data.sch_names.get(gpv_key, gpv_key), data.last_updated)
+
+def overview_svg(data, ts, gpv_keys):
+    """Усі черги на один день → SVG (str)"""
+    return render(overview_figsize(len(gpv_keys)), OVERVIEW_HEADER_H, 'Черга', HOURS_INLINE, 10, 10, 1.2,
+                  [data.sch_names.get(k, k) for k in gpv_keys], [data.schedule.row(ts, k) for k in gpv_keys],
+                  overview_title(data, ts), None, data.last_updated)
+
+def svg_jobs(data, only=('queues', 'today', 'tomorrow'), gpv_key=None):
+    """Список (ім'я файлу, функція, аргументи) - ті самі зображення, що й PNG у render_all"""
+    jobs = []
+    if 'queues' in only:
+        jobs += [(Path(format_gpv_filename(k)).with_suffix('.svg').name, queue_svg, (data, k))
+                 for k in ([gpv_key] if gpv_key else data.gpv_keys(data.today_ts))]
+    for day, ts in (('today', data.today_ts), ('tomorrow', data.tomorrow_ts)):
+        if day in only and data.gpv_keys(ts):
+            jobs.append((f'gpv-all-{day}.svg', overview_svg, (data, ts, data.gpv_keys(ts))))
+    return jobs
+
+def render_svgs(data, out_p, only=('queues', 'today', 'tomorrow'), gpv_key=None):
+    """
+    Усі SVG у out_p. Без hash/date: малювання дешевше за перевірку, файл пишеться тільки якщо змінився.
+    → {ім'я файлу: мс}
+    """
+    times = {}
+    for name, draw, draw_args in svg_jobs(data, only, gpv_key):
+        started = time.perf_counter()
+        svg = draw(*draw_args).encode()
+        times[name] = (time.perf_counter() - started) * 1000
+        if write_if_changed(out_p / name, svg):
+            print(f"[OK] {out_p / name} ({len(svg) / 1024:.1f} KB, {times[name]:.2f} ms)")
+        else:
+            print(f"[IDENTICAL] {name} (same bytes, not written)")
+    return times
+
+if __name__ == '__main__':
+    p = argparse.ArgumentParser()
+    p.add_argument('--json', required=True)
+    p.add_argument('--out', default='.')
+    args = p.parse_args()
+
+    out_p = Path(args.out)
+    out_p.mkdir(parents=True, exist_ok=True)
+    render_svgs(RenderData.load(args.json), out_p)
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Локальний замінник bezsvitla.com.ua: віддає записані HTML сторінки з fixtures/
+з налаштовуваною затримкою, помилками 5xx і 429 (Retry-After)
+- URL /vinnytska-oblast/cherha-1-1 → fixtures/bezsvitla/vinnytska-oblast/cherha-1-1/index.html
+- ETag (sha1 тіла) + Last-Modified, If-None-Match / If-Modified-Since → 304
+- випадковість з фіксованим seed, тож прогони повторювані
+
+    python scripts/replay_server.py fixtures/bezsvitla --port 8765 --latency 0.05 --error-rate 0.1
+    python scripts/parser.py --base-url http://127.0.0.1:8765 --output /tmp/gpv.json --no-archive
+"""
+import os
+import sys
+import time
+import random
+import hashlib
+import argparse
+import threading
+from collections import Counter
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, unquote
+
+# відносно репозиторію, а не поточної папки (скрипти запускають і з кореня, і з scripts/)
+DEFAULT_ROOT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures", "bezsvitla")
+DEFAULT_PORT = 8765
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    server_version = "ReplayServer/1.0"
+
+    def log_message(self, fmt, *args):
+        if self.server.verbose:
+            super().log_message(fmt, *args)
+
+    def _send(self, code, body=b'', headers=None):
+        self.send_response(code)
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if body and self.command != 'HEAD':
+            self.wfile.write(body)
+        self.server.record(code)
+
+    def do_GET(self):
+        srv = self.server
+        delay, fault = srv.draw()
+        if delay:
+            time.sleep(delay)
+        if fault == 'error':
+            return self._send(503, b'Service Unavailable', {'Content-Type': 'text/plain'})
+        if fault == 'throttle':
+            return self._send(429, b'Too Many Requests',
+                              {'Content-Type': 'text/plain', 'Retry-After': str(srv.retry_after)})
+
+        page = srv.page(urlsplit(self.path).path)
+        if page is None:
+            return self._send(404, b'Not Found', {'Content-Type': 'text/plain'})
+        body, etag, mtime = page
+        headers = {'ETag': etag, 'Last-Modified': formatdate(mtime, usegmt=True)}
+        if self.headers.get('If-None-Match') == etag:
+            return self._send(304, headers=headers)
+        since = self.headers.get('If-Modified-Since')
+        if since and not self.headers.get('If-None-Match'):
+            try:
+                if int(mtime) <= parsedate_to_datetime(since).timestamp():
+                    return self._send(304, headers=headers)
+            except (TypeError, ValueError):
+                pass
+        headers['Content-Type'] = 'text/html; charset=utf-8'
+        self._send(200, body, headers)
+
+    do_HEAD = do_GET
+
+class ReplayServer(ThreadingHTTPServer):
+    """HTTP сервер з фікстурами; лічильники запитів - у stats"""
+    daemon_threads = True
+
+    def __init__(self, root=DEFAULT_ROOT, port=DEFAULT_PORT, host='127.0.0.1', latency=0.0, jitter=0.0,
+                 error_rate=0.0, throttle_rate=0.0, retry_after=1, seed=0, verbose=False):
+        super().__init__((host, port), ReplayHandler)
+        self.root = os.path.abspath(root)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.verbose = verbose
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = Counter()
+        self.pages = {}
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def draw(self):
+        """(затримка, збій: None / 'error' / 'throttle') для наступного запиту"""
+        with self.lock:
+            delay = max(0.0, self.latency + self.rng.uniform(-self.jitter, self.jitter))
+            r = self.rng.random()
+        if r < self.error_rate:
+            return delay, 'error'
+        if r < self.error_rate + self.throttle_rate:
+            return delay, 'throttle'
+        return delay, None
+
+    def record(self, code):
+        with self.lock:
+            self.stats['requests'] += 1
+            self.stats[code] += 1
+
+    def reset_stats(self):
+        with self.lock:
+            self.stats.clear()
+
+    def page(self, path):
+        """URL шлях → (тіло, ETag, mtime) або None (файли читаються один раз)"""
+        if path in self.pages:
+            return self.pages[path]
+        rel = os.path.normpath(unquote(path).strip('/'))
+        if rel.startswith('..'):
+            return None
+        file_path = os.path.join(self.root, rel)
+        if os.path.isdir(file_path):
+            file_path = os.path.join(file_path, 'index.html')
+        if not os.path.isfile(file_path):
+            return None
+        with open(file_path, 'rb') as f:
+            body = f.read()
+        page = (body, f'"{hashlib.sha1(body).hexdigest()[:16]}"', os.path.getmtime(file_path))
+        self.pages[path] = page
+        return page
+
+def start_server(root=DEFAULT_ROOT, port=0, **options):
+    """Запускає ReplayServer у фоновому потоці (port=0 - будь-який вільний). Зупинка: server.shutdown()"""
+    server = ReplayServer(root, port, **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+if __name__ == '__main__':
+    p = argparse.ArgumentParser()
+    p.add_argument('root', nargs='?', default=DEFAULT_ROOT, help='папка фікстур')
+    p.add_argument('--host', default='127.0.0.1')
+    p.add_argument('--port', type=int, default=DEFAULT_PORT)
+    p.add_argument('--latency', type=float, default=0.0, help='сек затримки на запит')
+    p.add_argument('--jitter', type=float, default=0.0, help='± сек до затримки')
+    p.add_argument('--error-rate', type=float, default=0.0, help='частка відповідей 503')
+    p.add_argument('--throttle-rate', type=float, default=0.0, help='частка відповідей 429')
+    p.add_argument('--retry-after', type=int, default=1, help='Retry-After для 429, сек')
+    p.add_argument('--seed', type=int, default=0)
+    p.add_argument('--verbose', action='store_true', help='логувати кожен запит')
+    args = p.parse_args()
+    if not any(name.endswith('.html') for _, _, files in os.walk(args.root) for name in files):
+        print(f"ERROR: no fixtures in {args.root}")
+        sys.exit(1)
+
+    server = ReplayServer(args.root, args.port, args.host, args.latency, args.jitter,
+                          args.error_rate, args.throttle_rate, args.retry_after, args.seed, args.verbose)
+    print(f"[REPLAY] {server.root} → {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"\n[STATS] {dict(server.stats)}")
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Паралельна обробка кількох регіонів (scripts/regions.py)
+Кожен регіон - свій потік: завантаження черг → GPV JSON (data/<file>.json), зі своїм HTTP кешем,
+планувальником і circuit breaker. Rate limit спільний на хост: регіони з одного сайту
+ділять один TokenBucket (--host-rate запитів/сек на всі регіони разом).
+Після парсингу (з --render) - PNG кожного регіону в images/<file>/ (послідовно: matplotlib не потокобезпечний).
+
+    python scripts/run_regions.py                       # усі регіони
+    python scripts/run_regions.py --regions vinnytsia --adaptive --render
+"""
+import sys
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import parser as gpv_parser
+from http_cache import ResponseCache
+from poll_planner import PollPlanner
+from circuit_breaker import CircuitBreaker
+from html_extract import EXTRACTORS, DEFAULT_BACKEND as DEFAULT_EXTRACTOR
+from regions import REGIONS, get_region, region_paths
+from render_common import BACKENDS, DEFAULT_BACKEND as DEFAULT_RENDER_BACKEND
+
+def run_region(session, region, bucket, args):
+    """Один регіон: завантаження → GPV JSON. Повертає (id, ок, секунди)"""
+    started = time.monotonic()
+    paths = region_paths(region)
+    cache = None if args.no_cache else ResponseCache(paths['cache'])
+    planner = PollPlanner(paths['planner']) if args.adaptive and cache else None
+    breaker = None if args.no_breaker else CircuitBreaker(paths['breaker'])
+    try:
+        qdata = gpv_parser.fetch_queues(session, workers=args.workers, run_deadline=args.deadline, cache=cache,
+                                        backend=args.extractor, planner=planner, queue_budget=args.queue_budget,
+                                        breaker=breaker, site=args.base_url, region=region, bucket=bucket)
+        gpv_parser.save_results(qdata, archive_path=None if args.no_archive else paths['archive'],
+                                output_path=paths['output'], region=region, fresh_path=paths['fresh'])
+        return region['id'], True, time.monotonic() - started
+    except Exception as e:
+        gpv_parser.log(f"❌ {region['id']}: {e}")
+        return region['id'], False, time.monotonic() - started
+
+def render_region(region, backend, jobs=1):
+    """PNG регіону: окремі черги, усі на сьогодні, усі на завтра (render_all; черги - jobs процесів)"""
+    from render_all import render_all, PNG_CACHE_DIR
+
+    paths = region_paths(region)
+    render_all(paths['output'], paths['images'], backend=backend, jobs=jobs, cache_dir=PNG_CACHE_DIR)
+
+def run_regions(regions, args):
+    """Усі регіони паралельно зі спільним rate limit на хост → [(id, ок, секунди)]"""
+    buckets = {}
+    for region in regions:
+        host = urlsplit(args.base_url or region['site']).netloc
+        buckets.setdefault(host, gpv_parser.TokenBucket(args.host_rate, args.burst))
+    session = gpv_parser.create_session(args.workers * len(regions))
+    with ThreadPoolExecutor(max_workers=len(regions)) as pool:
+        futures = [pool.submit(run_region, session, region,
+                               buckets[urlsplit(args.base_url or region['site']).netloc], args)
+                   for region in regions]
+        results = [f.result() for f in futures]
+    if args.render:
+        for region_id, ok, _ in results:
+            if ok:
+                render_region(get_region(region_id), args.render_backend, args.render_jobs)
+    return results
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="GPV BezSvitla - кілька регіонів паралельно")
+    p.add_argument('--regions', default='all', help='id через кому або all')
+    p.add_argument('--workers', type=int, default=gpv_parser.DEFAULT_WORKERS, help='одночасних запитів на регіон')
+    p.add_argument('--host-rate', type=float, default=gpv_parser.DEFAULT_RATE,
+                   help='запитів/сек на хост (спільно для всіх регіонів)')
+    p.add_argument('--burst', type=float, default=gpv_parser.DEFAULT_BURST)
+    p.add_argument('--deadline', type=float, default=gpv_parser.DEFAULT_DEADLINE, help='сек на прогін регіону')
+    p.add_argument('--queue-budget', type=float, default=gpv_parser.DEFAULT_QUEUE_BUDGET)
+    p.add_argument('--base-url', default=None, help='заміна адреси сайту для всіх регіонів (replay_server)')
+    p.add_argument('--extractor', choices=sorted(EXTRACTORS), default=DEFAULT_EXTRACTOR)
+    p.add_argument('--adaptive', action='store_true')
+    p.add_argument('--no-cache', action='store_true')
+    p.add_argument('--no-breaker', action='store_true')
+    p.add_argument('--no-archive', action='store_true')
+    p.add_argument('--render', action='store_true', help='після парсингу згенерувати PNG кожного регіону')
+    p.add_argument('--render-backend', choices=sorted(BACKENDS), default=DEFAULT_RENDER_BACKEND,
+                   help='бекенд PNG для --render: mpl - matplotlib, raster - NumPy + Pillow')
+    p.add_argument('--render-jobs', type=int, default=1, help='процесів для PNG черг (render_all --jobs)')
+    args = p.parse_args(argv)
+    if args.base_url:
+        args.base_url = args.base_url.rstrip('/')
+    return args
+
+if __name__ == '__main__':
+    args = parse_args()
+    ids = sorted(REGIONS) if args.regions == 'all' else [r.strip() for r in args.regions.split(',') if r.strip()]
+    try:
+        regions = [get_region(r) for r in ids]
+    except KeyError as e:
+        print(f"ERROR: {e.args[0]}", file=sys.stderr)
+        sys.exit(2)
+
+    results = run_regions(regions, args)
+    for region_id, ok, seconds in results:
+        print(f"[{'OK' if ok else 'FAIL'}] {region_id}: {seconds:.1f}s")
+    failed = [r for r, ok, _ in results if not ok]
+    print(f"\n[STATS] Regions: {len(results)}, Failed: {len(failed)}")
+    sys.exit(1 if failed else 0)
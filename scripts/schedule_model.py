@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+In-memory модель розкладу: Schedule / QueueDay
+Стани слотів зберігаються масивом кодів (slot_mask.STATES: 0 yes, 1 first, 2 second, 3 no),
+індекс - (timestamp дня, GPV ключ), тож будь-яка черга-день знаходиться за O(1).
+Черга без даних (сторінка недоступна) - QueueDay з missing=True, а не вигадане "все yes";
+у GPV JSON вона записується як {}.
+"""
+import numpy as np
+
+from slot_mask import STATES, STATE_CODES, YES
+
+SLOT_COUNT = 24
+
+class QueueDay:
+    """Стани 24 слотів однієї черги на один день"""
+    __slots__ = ('day', 'gpv_key', 'codes')
+
+    def __init__(self, day, gpv_key, codes=None):
+        self.day = int(day)
+        self.gpv_key = gpv_key
+        self.codes = None if codes is None else np.asarray(codes, dtype=np.uint8)
+
+    @property
+    def missing(self):
+        return self.codes is None
+
+    @classmethod
+    def from_slots(cls, day, gpv_key, slots):
+        """{"1": "yes", ...} → QueueDay ({} або None → missing)"""
+        if not slots:
+            return cls(day, gpv_key)
+        codes = [STATE_CODES.get(slots.get(str(i), 'yes'), YES) for i in range(1, SLOT_COUNT + 1)]
+        return cls(day, gpv_key, codes)
+
+    def row(self):
+        """Коди станів для малювання (missing → всі "yes")"""
+        return EMPTY_ROW if self.codes is None else self.codes
+
+    def state(self, slot):
+        """Стан слоту 1-24 рядком"""
+        return STATES[int(self.row()[slot - 1])]
+
+    def to_slots(self):
+        """QueueDay → {"1": "yes", ...} (missing → {})"""
+        if self.codes is None:
+            return {}
+        return {str(i + 1): STATES[c] for i, c in enumerate(self.codes)}
+
+    def __repr__(self):
+        return f"QueueDay({self.day}, {self.gpv_key!r}, missing={self.missing})"
+
+EMPTY_ROW = np.zeros(SLOT_COUNT, dtype=np.uint8)
+EMPTY_ROW.flags.writeable = False
+
+class Schedule:
+    """Усі черги-дні документа, індексовані за (day, gpv_key)"""
+    __slots__ = ('days', 'index')
+
+    def __init__(self):
+        self.days = []      # timestamps у порядку документа
+        self.index = {}     # (day, gpv_key) → QueueDay
+
+    def add(self, queue_day):
+        if queue_day.day not in self.days:
+            self.days.append(queue_day.day)
+        self.index[(queue_day.day, queue_day.gpv_key)] = queue_day
+        return queue_day
+
+    def get(self, day, gpv_key):
+        """QueueDay або None, якщо такої черги в документі немає зовсім"""
+        return self.index.get((int(day), gpv_key))
+
+    def row(self, day, gpv_key):
+        """Коди станів черги-дня (відсутня або missing → всі "yes")"""
+        qd = self.index.get((int(day), gpv_key))
+        return EMPTY_ROW if qd is None else qd.row()
+
+    def gpv_keys(self, day=None):
+        """Відсортовані GPV ключі (для дня або всі)"""
+        return sorted({k for d, k in self.index if day is None or d == int(day)})
+
+    def missing(self):
+        """Список (day, gpv_key) без даних"""
+        return [key for key, qd in self.index.items() if qd.missing]
+
+    @classmethod
+    def from_gpv(cls, fact_data):
+        """fact.data GPV JSON → Schedule"""
+        schedule = cls()
+        for day, queues in fact_data.items():
+            for gpv_key, slots in queues.items():
+                schedule.add(QueueDay.from_slots(day, gpv_key, slots))
+        return schedule
+
+    def to_gpv(self):
+        """Schedule → fact.data GPV JSON (порядок днів і черг зберігається)"""
+        data = {}
+        for (day, gpv_key), qd in self.index.items():
+            data.setdefault(str(day), {})[gpv_key] = qd.to_slots()
+        return data
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Half-hour interval engine для слотів GPV
+Доба = 48 півгодин. Кожен інтервал без світла розкладається на маску з 48 елементів
+(всі інтервали разом, за один прохід), а стан слоту 1-24 береться з двох його половин:
+- "yes"    - обидві половини зі світлом
+- "first"  - перші 30 хв без світла
+- "second" - другі 30 хв без світла
+- "no"     - вся година без світла
+Перекриття і суміжні інтервали об'єднуються, порядок інтервалів не впливає на результат.
+
+Властивості і відмінності від старих правил parse_html_schedule - tests/test_slot_mask.py.
+"""
+import numpy as np
+
+HALF_HOURS = 48
+# Код стану = (перша половина off) | (друга половина off) << 1
+STATES = ('yes', 'first', 'second', 'no')
+STATE_CODES = {s: i for i, s in enumerate(STATES)}
+YES, FIRST, SECOND, NO = range(4)
+
+def interval_to_halves(start_hour, start_minute, end_hour, end_minute):
+    """
+    Інтервал HH:MM-HH:MM → [start, end) у півгодинах.
+    Початок округлюється вниз, кінець - вгору (23:59 → 48, тобто до кінця доби).
+    Кінець = початок - порожній інтервал; кінець 00:00 або раніше початку - до кінця доби.
+    """
+    start = start_hour * 2 + (1 if start_minute >= 30 else 0)
+    end = end_hour * 2 + (end_minute + 29) // 30
+    if (end_hour, end_minute) == (start_hour, start_minute):
+        end = start
+    elif (end_hour, end_minute) < (start_hour, start_minute) or (end_hour, end_minute) == (0, 0):
+        end = HALF_HOURS
+    return min(start, HALF_HOURS), min(end, HALF_HOURS)
+
+def rasterize(intervals):
+    """Список (sh, sm, eh, em) → bool маска з 48 півгодин (O(intervals + 48))"""
+    if not intervals:
+        return np.zeros(HALF_HOURS, dtype=bool)
+    bounds = np.array([interval_to_halves(*t) for t in intervals], dtype=np.intp)
+    diff = (np.bincount(bounds[:, 0], minlength=HALF_HOURS + 1)
+            - np.bincount(bounds[:, 1], minlength=HALF_HOURS + 1))
+    return np.cumsum(diff[:HALF_HOURS]) > 0
+
+def mask_to_codes(mask):
+    """Маска 48 → коди станів 24 слотів (0..3)"""
+    mask = np.asarray(mask, dtype=np.uint8)
+    return mask[0::2] | (mask[1::2] << 1)
+
+def codes_to_slots(codes):
+    """Коди станів → {"1": "yes", ..., "24": "no"}"""
+    return {str(i + 1): STATES[c] for i, c in enumerate(codes)}
+
+def slots_to_codes(slots):
+    """{"1": "yes", ...} → коди станів (відсутні слоти - "yes")"""
+    return np.array([STATE_CODES.get(slots.get(str(i), 'yes'), 0) for i in range(1, 25)], dtype=np.uint8)
+
+def codes_to_mask(codes):
+    """Коди станів 24 слотів → bool маска з 48 півгодин"""
+    codes = np.asarray(codes, dtype=np.uint8)
+    mask = np.empty(HALF_HOURS, dtype=bool)
+    mask[0::2] = codes & 1
+    mask[1::2] = codes & 2
+    return mask
+
+def intervals_to_slots(intervals):
+    """Інтервали без світла → слоти 1-24"""
+    return codes_to_slots(mask_to_codes(rasterize(intervals)))
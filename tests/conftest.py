@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Скрипти імпортують один одного за іменем модуля (запуск з scripts/)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts'))
@@ -0,0 +1,145 @@
+"""
+Властивості half-hour engine (scripts/slot_mask.py) на випадкових інтервалах з довільними хвилинами,
+з перекриттями і в будь-якому порядку. Генератор - random з фіксованим seed (повторювано без hypothesis).
+- проти еталону по хвилинах: півгодина без світла ⇔ хоч одна її хвилина всередині інтервалу
+- проти старих правил parse_html_schedule - там, де вони мають збігатися (межі :00/:30, без перекриттів)
+- явні очікувані значення там, де engine свідомо відрізняється від старих правил
+"""
+import random
+
+import numpy as np
+import pytest
+
+from slot_mask import (HALF_HOURS, STATES, interval_to_halves, rasterize, mask_to_codes, codes_to_mask,
+                       codes_to_slots, slots_to_codes, intervals_to_slots)
+
+CASES = 2000
+DAY_MINUTES = 24 * 60
+
+def legacy_slots(intervals):
+    """Старі правила parse_html_schedule (останній інтервал перезаписує попередні)"""
+    hour_to_slot = lambda h: 1 if h == 0 else h + 1
+    slots = {str(i): "yes" for i in range(1, 25)}
+    for sh, sm, eh, em in intervals:
+        start_slot = hour_to_slot(sh)
+        actual_end_hour = eh + 1 if em >= 30 else eh
+        for slot in range(start_slot, hour_to_slot(actual_end_hour)):
+            if 1 <= slot <= 24:
+                slots[str(slot)] = "no"
+        if sm != 0 and start_slot <= 24:
+            slots[str(start_slot)] = "second" if sm >= 30 else "first"
+        if em != 0:
+            last_slot = hour_to_slot(actual_end_hour - 1)
+            if last_slot <= 24 and not (eh == 23 and em == 59):
+                slots[str(last_slot)] = "first" if em <= 30 else "second"
+    return slots
+
+def minute_mask(intervals):
+    """Еталон: маска 48 півгодин через хвилини доби"""
+    minutes = np.zeros(DAY_MINUTES, dtype=bool)
+    for sh, sm, eh, em in intervals:
+        start, end = sh * 60 + sm, eh * 60 + em
+        if end < start or (end == 0 and start > 0):
+            end = DAY_MINUTES
+        minutes[start:end] = True
+    return minutes.reshape(HALF_HOURS, 30).any(axis=1)
+
+def random_time(rng):
+    return rng.randrange(24), rng.randrange(60)
+
+def random_intervals(rng):
+    """0-6 довільних інтервалів: будь-які хвилини, перекриття, через північ, нульові, до 23:59 / 00:00"""
+    intervals = []
+    for _ in range(rng.randrange(7)):
+        start = random_time(rng)
+        kind = rng.random()
+        if kind < 0.1:
+            end = start
+        elif kind < 0.2:
+            end = rng.choice([(23, 59), (0, 0)])
+        else:
+            end = random_time(rng)
+        intervals.append(start + end)
+    return intervals
+
+def aligned_intervals(rng):
+    """Непересічні інтервали по :00/:30 з проміжком щонайменше в годину (межі на різних слотах)"""
+    intervals = []
+    h = rng.randrange(0, 6)
+    while h < HALF_HOURS - 1:
+        end = min(HALF_HOURS, h + rng.randrange(1, 12))
+        eh, em = (23, 59) if end == HALF_HOURS else (end // 2, 30 * (end % 2))
+        intervals.append((h // 2, 30 * (h % 2), eh, em))
+        h = end + rng.randrange(3, 10)
+    rng.shuffle(intervals)
+    return intervals
+
+def off_slots(intervals):
+    return {k: v for k, v in intervals_to_slots(intervals).items() if v != 'yes'}
+
+def test_matches_minute_reference():
+    rng = random.Random(0)
+    for _ in range(CASES):
+        intervals = random_intervals(rng)
+        assert (rasterize(intervals) == minute_mask(intervals)).all(), intervals
+
+def test_order_independent():
+    rng = random.Random(1)
+    for _ in range(CASES):
+        intervals = random_intervals(rng)
+        shuffled = intervals[:]
+        rng.shuffle(shuffled)
+        assert intervals_to_slots(intervals) == intervals_to_slots(shuffled), intervals
+
+def test_union_of_parts():
+    """Маска набору = OR масок окремих інтервалів (перекриття і суміжні об'єднуються)"""
+    rng = random.Random(2)
+    for _ in range(CASES):
+        intervals = random_intervals(rng)
+        expected = np.zeros(HALF_HOURS, dtype=bool)
+        for interval in intervals:
+            expected |= rasterize([interval])
+        assert (rasterize(intervals) == expected).all(), intervals
+
+def test_matches_legacy_on_aligned_intervals():
+    rng = random.Random(3)
+    for _ in range(CASES):
+        intervals = aligned_intervals(rng)
+        assert intervals_to_slots(intervals) == legacy_slots(intervals), intervals
+
+def test_codes_roundtrip():
+    rng = random.Random(4)
+    for _ in range(CASES):
+        codes = np.array([rng.randrange(len(STATES)) for _ in range(24)], dtype=np.uint8)
+        assert (mask_to_codes(codes_to_mask(codes)) == codes).all()
+        assert (slots_to_codes(codes_to_slots(codes)) == codes).all()
+
+# Де engine свідомо відрізняється від старих правил: (інтервали, engine - слоти не "yes", старі правила)
+DIFFERENCES = [
+    # межа посеред півгодини округлюється назовні, а не позначає лише один слот
+    ([(10, 0, 11, 15)], {'11': 'no', '12': 'first'}, {'11': 'first'}),
+    ([(10, 15, 11, 0)], {'11': 'no'}, {'11': 'first'}),
+    ([(10, 45, 11, 40)], {'11': 'second', '12': 'no'}, {'11': 'second', '12': 'second'}),
+    # кінець 00:00 і через північ - до кінця доби
+    ([(22, 0, 0, 0)], {'23': 'no', '24': 'no'}, {}),
+    ([(22, 30, 1, 0)], {'23': 'second', '24': 'no'}, {'23': 'second'}),
+    # перекриття об'єднуються, а не перезаписуються останнім інтервалом
+    ([(10, 0, 12, 0), (10, 30, 11, 0)], {'11': 'no', '12': 'no'}, {'11': 'second', '12': 'no'}),
+]
+
+@pytest.mark.parametrize('intervals, engine, legacy', DIFFERENCES)
+def test_known_differences(intervals, engine, legacy):
+    assert off_slots(intervals) == engine
+    assert {k: v for k, v in legacy_slots(intervals).items() if v != 'yes'} == legacy
+
+@pytest.mark.parametrize('interval, halves', [
+    ((10, 0, 10, 0), (20, 20)),      # нульовий інтервал - порожній
+    ((16, 29, 16, 29), (32, 32)),    # нульовий і не на межі півгодини
+    ((10, 40, 10, 45), (21, 22)),    # в межах однієї півгодини
+    ((10, 45, 10, 40), (21, 48)),    # кінець раніше початку - до кінця доби
+    ((0, 0, 0, 0), (0, 0)),          # 00:00-00:00 - теж нульовий
+    ((12, 0, 0, 0), (24, 48)),       # кінець 00:00 - до кінця доби
+    ((23, 0, 23, 59), (46, 48)),
+])
+def test_interval_to_halves(interval, halves):
+    assert interval_to_halves(*interval) == halves